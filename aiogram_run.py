@@ -1,6 +1,16 @@
 import asyncio
 import logging
-from create_bot import bot, dp, scheduler, pg_db, default_service_user_id
+from config import get_settings
+from create_bot import (
+    bot,
+    dp,
+    scheduler,
+    pg_db,
+    outbox,
+    request_limiter,
+    default_service_user_id,
+)
+from db_handler.cache import user_cache, active_collector_cache, unregistered_cache
 from handlers.start import start_router
 from handlers.register import register_router
 from handlers.wish_handler import wishlist_router
@@ -10,21 +20,64 @@ from handlers.admin_handler import admin_router
 from handlers.collector_handler import collector_router
 from handlers.service_user_handler import service_user_router
 from handlers.set_role_handler import role_router
+from handlers.services.service_broadcast import (
+    resume_broadcasts,
+    shutdown_broadcasts,
+)
 from middlewares import (
+    ConcurrencyLimitMiddleware,
     DIMiddleware,
     RegistrationMiddleware,
     RequireAdmin,
     RequireServiceUser,
+    ThrottlingMiddleware,
+)
+from scheduler_functions.birthday_notification import (
+    send_birthday_digest,
+    send_birthday_notifications,
 )
-from scheduler_functions.birthday_notification import send_birthday_notifications
 from scheduler_functions.assign_backup_collector import assign_backup_collector
+from scheduler_functions.reminder_cleanup import delete_expired_reminders
+from utils.dispatch_index import install_dispatch_index
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+throttling = ThrottlingMiddleware(
+    limits={
+        "default": (settings.throttle_rate, settings.throttle_burst),
+        "heavy": (settings.throttle_heavy_rate, settings.throttle_heavy_burst),
+    }
+)
+concurrency_limit = ConcurrencyLimitMiddleware(
+    limit=settings.handlers_concurrency,
+    queue_size=settings.handlers_queue_size,
+)
 
 
 async def shutdown():
     """Корректное завершение работы бота"""
     logger.info("Остановка бота...")
+    logger.info(f"Кэш пользователей: {user_cache.stats()}")
+    logger.info(f"Кэш активного коллектора: {active_collector_cache.stats()}")
+    logger.info(f"Кэш незарегистрированных: {unregistered_cache.stats()}")
+    logger.info(f"Отброшено апдейтов (throttling): {throttling.stats()}")
+    logger.info(f"Очередь обработки апдейтов: {concurrency_limit.stats()}")
+    logger.info(f"Запросы к Bot API: {request_limiter.stats()}")
+
+    # Отправляем оставшиеся сообщения из очереди
+    try:
+        await outbox.stop()
+        logger.info(f"Очередь отправки остановлена: {outbox.stats()}")
+    except Exception as e:
+        logger.exception(f"Ошибка при остановке очереди отправки: {e}")
+
+    # Прерываем рассылки до закрытия БД: они сохраняют прогресс
+    # и продолжатся после запуска
+    try:
+        await shutdown_broadcasts()
+    except Exception as e:
+        logger.exception(f"Ошибка при остановке рассылок: {e}")
 
     # Останавливаем scheduler
     if scheduler.running:
@@ -51,21 +104,39 @@ async def main():
         await pg_db.create_pool()
         await pg_db.init_data(default_service_user_id)
 
+        if settings.birthday_digest:
+            # Все напоминания за завтра и через неделю — одним сообщением
+            scheduler.add_job(
+                send_birthday_digest,
+                "cron",
+                hour=16,
+                minute=23,
+                args=(bot, pg_db),
+            )
+        else:
+            scheduler.add_job(
+                send_birthday_notifications,
+                "cron",
+                hour=16,
+                minute=23,
+                args=(bot, 7, pg_db),
+            )
+            scheduler.add_job(
+                send_birthday_notifications,
+                "cron",
+                hour=16,
+                minute=23,
+                args=(bot, 1, pg_db),
+            )
+        scheduler.add_job(pg_db.clear_past_birthday_records, "cron", hour=0, minute=0)
+        # Удаление напоминаний о прошедших днях рождения
         scheduler.add_job(
-            send_birthday_notifications,
-            "cron",
-            hour=16,
-            minute=23,
-            args=(bot, 7, pg_db),
-        )
-        scheduler.add_job(
-            send_birthday_notifications,
+            delete_expired_reminders,
             "cron",
-            hour=16,
-            minute=23,
-            args=(bot, 1, pg_db),
+            hour=0,
+            minute=10,
+            args=(bot, pg_db),
         )
-        scheduler.add_job(pg_db.clear_past_birthday_records, "cron", hour=0, minute=0)
 
         # Автоматическое назначение запасного коллектора 24 февраля в 9:00
         scheduler.add_job(
@@ -80,9 +151,16 @@ async def main():
 
         scheduler.start()
 
-        # Глобальные middleware (порядок важен: DI → Registration → Role)
-        dp.message.middleware(DIMiddleware(pg_db))
-        dp.callback_query.middleware(DIMiddleware(pg_db))
+        # Ограничение одновременно выполняемых хендлеров. Регистрируется
+        # после FSMContextMiddleware: апдейты, ждущие предыдущий апдейт
+        # того же пользователя, не занимают место в очереди
+        dp.update.outer_middleware(concurrency_limit)
+
+        # Глобальные middleware (порядок важен: Throttling → DI → Registration → Role)
+        dp.message.middleware(throttling)
+        dp.callback_query.middleware(throttling)
+        dp.message.middleware(DIMiddleware(pg_db, outbox))
+        dp.callback_query.middleware(DIMiddleware(pg_db, outbox))
         dp.message.middleware(RegistrationMiddleware())
         dp.callback_query.middleware(RegistrationMiddleware())
 
@@ -97,10 +175,20 @@ async def main():
         dp.include_routers(
             admin_router, collector_router, service_user_router, role_router
         )
+        # Хендлеры с TextEquals / DataEquals ищутся по словарю
+        install_dispatch_index(dp)
+
         await bot.delete_webhook(drop_pending_updates=True)
 
+        # Продолжаем рассылки, прерванные перезапуском
+        await resume_broadcasts(bot, pg_db)
+        # Воркеры очереди отправки (с сохранёнными до перезапуска сообщениями)
+        await outbox.start()
+
         logger.info("Бот запущен")
-        await dp.start_polling(bot)
+        await dp.start_polling(
+            bot, tasks_concurrency_limit=settings.updates_concurrency
+        )
 
     except KeyboardInterrupt:
         logger.info("Получен сигнал остановки")
@@ -0,0 +1,30 @@
+"""users.last_seen_at: последняя активность пользователя
+
+Revision ID: 3d9a7e5c2b18
+Revises: f2a8b6d4c913
+Create Date: 2026-10-17 15:12:40.551307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d9a7e5c2b18'
+down_revision: Union[str, Sequence[str], None] = 'f2a8b6d4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_users_last_seen_at'), 'users', ['last_seen_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_last_seen_at'), table_name='users')
+    op.drop_column('users', 'last_seen_at')
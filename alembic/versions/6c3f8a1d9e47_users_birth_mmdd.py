@@ -0,0 +1,42 @@
+"""users.birth_mmdd: месяц и день рождения для календарных запросов
+
+Revision ID: 6c3f8a1d9e47
+Revises: 9b1e4d7f3a62
+Create Date: 2026-10-17 17:05:48.126093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c3f8a1d9e47'
+down_revision: Union[str, Sequence[str], None] = '9b1e4d7f3a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column(
+            'birth_mmdd',
+            sa.SmallInteger(),
+            sa.Computed(
+                '(EXTRACT(MONTH FROM birth_date) * 100'
+                ' + EXTRACT(DAY FROM birth_date))::smallint',
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(op.f('ix_users_birth_mmdd'), 'users', ['birth_mmdd'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_birth_mmdd'), table_name='users')
+    op.drop_column('users', 'birth_mmdd')
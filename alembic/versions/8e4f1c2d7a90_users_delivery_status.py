@@ -0,0 +1,28 @@
+"""users.delivery_status: недоступные для доставки чаты
+
+Revision ID: 8e4f1c2d7a90
+Revises: 5b2c9e7a1f43
+Create Date: 2026-10-17 11:40:05.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f1c2d7a90'
+down_revision: Union[str, Sequence[str], None] = '5b2c9e7a1f43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('delivery_status', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'delivery_status')
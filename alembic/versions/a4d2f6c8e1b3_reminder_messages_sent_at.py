@@ -0,0 +1,35 @@
+"""reminder_messages.sent_at: время отправки напоминания
+
+Revision ID: a4d2f6c8e1b3
+Revises: 6c3f8a1d9e47
+Create Date: 2026-10-17 19:05:12.384615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d2f6c8e1b3'
+down_revision: Union[str, Sequence[str], None] = '6c3f8a1d9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Уже сохранённые напоминания считаются отправленными сейчас
+    op.add_column(
+        'reminder_messages',
+        sa.Column(
+            'sent_at', sa.DateTime(), nullable=False, server_default=sa.func.now()
+        ),
+    )
+    op.alter_column('reminder_messages', 'sent_at', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('reminder_messages', 'sent_at')
@@ -0,0 +1,51 @@
+"""Рассылки: message_id/is_pinned доставок и source_job_id
+
+Revision ID: c71a3e9b5d24
+Revises: 8e4f1c2d7a90
+Create Date: 2026-10-17 13:05:47.661250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71a3e9b5d24'
+down_revision: Union[str, Sequence[str], None] = '8e4f1c2d7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('broadcast_deliveries', sa.Column('message_id', sa.BigInteger(), nullable=True))
+    op.add_column(
+        'broadcast_deliveries',
+        sa.Column('is_pinned', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+    op.create_index(
+        'ix_broadcast_deliveries_pinned',
+        'broadcast_deliveries',
+        ['user_id'],
+        postgresql_where=sa.text('is_pinned'),
+    )
+    op.add_column('broadcast_jobs', sa.Column('source_job_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'broadcast_jobs_source_job_id_fkey',
+        'broadcast_jobs',
+        'broadcast_jobs',
+        ['source_job_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('broadcast_jobs_source_job_id_fkey', 'broadcast_jobs', type_='foreignkey')
+    op.drop_column('broadcast_jobs', 'source_job_id')
+    op.drop_index('ix_broadcast_deliveries_pinned', table_name='broadcast_deliveries')
+    op.drop_column('broadcast_deliveries', 'is_pinned')
+    op.drop_column('broadcast_deliveries', 'message_id')
@@ -0,0 +1,42 @@
+"""reminder_messages: отправленные напоминания о ДР
+
+Revision ID: f2a8b6d4c913
+Revises: c71a3e9b5d24
+Create Date: 2026-10-17 14:21:09.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8b6d4c913'
+down_revision: Union[str, Sequence[str], None] = 'c71a3e9b5d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'reminder_messages',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('chat_id', sa.BigInteger(), nullable=False),
+        sa.Column('message_id', sa.BigInteger(), nullable=False),
+        sa.Column('birthday_user_id', sa.BigInteger(), nullable=False),
+        sa.Column('expires_on', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['chat_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['birthday_user_id'], ['users.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_reminder_messages_expires_on'), 'reminder_messages', ['expires_on']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reminder_messages_expires_on'), table_name='reminder_messages')
+    op.drop_table('reminder_messages')
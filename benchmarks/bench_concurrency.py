@@ -0,0 +1,110 @@
+"""
+Бенчмарк пропускной способности при конкурентной обработке апдейтов.
+
+Диспетчер с MemoryStorage и UserEventIsolation, как в create_bot,
+хендлер ждёт 10 мс (запрос к БД или Bot API). Апдейты запускаются
+задачами с ограничением через семафор, как это делает start_polling
+с tasks_concurrency_limit. Для каждого предела считается время
+обработки и проверяется, что апдейты одного пользователя обработаны
+в порядке поступления.
+
+Запуск из корня репозитория (БД и токен бота не нужны):
+
+    python -m benchmarks.bench_concurrency
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Chat, Message, Update
+from aiogram.types import User as TelegramUser
+
+from utils.event_isolation import UserEventIsolation
+
+HANDLER_DELAY = 0.01
+LIMITS = (1, 10, 50, 100)
+USERS = 100
+UPDATES_PER_USER = 10
+
+
+def _build_dispatcher(processed: dict[int, list[int]]) -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def handler(message: Message) -> None:
+        await asyncio.sleep(HANDLER_DELAY)
+        processed[message.from_user.id].append(message.message_id)
+
+    dp = Dispatcher(storage=MemoryStorage(), events_isolation=UserEventIsolation())
+    dp.include_router(router)
+    assert isinstance(dp.fsm.events_isolation, UserEventIsolation)
+    return dp
+
+
+def _build_updates(users: int, per_user: int) -> list[Update]:
+    """Апдейты пользователей вперемешку, message_id растёт по порядку."""
+    updates = []
+    for i in range(users * per_user):
+        user_id = i % users + 1
+        updates.append(
+            Update(
+                update_id=i,
+                message=Message(
+                    message_id=i,
+                    date=datetime.now(),
+                    chat=Chat(id=user_id, type="private"),
+                    from_user=TelegramUser(id=user_id, is_bot=False, first_name="Иван"),
+                    text="Кнопка",
+                ),
+            )
+        )
+    return updates
+
+
+async def _feed(bot: Bot, updates: list[Update], limit: int) -> tuple[float, bool]:
+    processed: dict[int, list[int]] = defaultdict(list)
+    dp = _build_dispatcher(processed)
+    semaphore = asyncio.Semaphore(limit)
+    tasks = set()
+
+    started = time.perf_counter()
+    for update in updates:
+        await semaphore.acquire()
+        task = asyncio.create_task(dp.feed_update(bot, update))
+        task.add_done_callback(lambda _: semaphore.release())
+        tasks.add(task)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    ordered = all(ids == sorted(ids) for ids in processed.values())
+    assert sum(map(len, processed.values())) == len(updates)
+    return elapsed, ordered
+
+
+async def main() -> None:
+    bot = Bot("42:TEST")
+    try:
+        scenarios = (
+            (f"{USERS} пользователей", _build_updates(USERS, UPDATES_PER_USER)),
+            ("1 пользователь", _build_updates(1, 100)),
+        )
+        for name, updates in scenarios:
+            print(f"{name}, {len(updates)} апдейтов, хендлер {HANDLER_DELAY * 1000:.0f} мс")
+            print(f"{'предел':>8} {'время, с':>10} {'апдейтов/с':>12} {'порядок':>8}")
+            for limit in LIMITS:
+                elapsed, ordered = await _feed(bot, updates, limit)
+                print(
+                    f"{limit:>8} {elapsed:>10.2f} {len(updates) / elapsed:>12.0f} "
+                    f"{'да' if ordered else 'НЕТ':>8}"
+                )
+            print()
+    finally:
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+"""
+Бенчмарк стоимости обработки апдейта диспетчером.
+
+1. Обычный TelegramEventObserver.trigger (фильтры хендлеров проверяются
+   по очереди во всех роутерах) против индекса по точному значению text
+   (utils.dispatch_index) при росте числа роутеров.
+2. Путь апдейта через RegistrationMiddleware, когда пользователь есть
+   в user_cache, и когда его приходится загружать из БД.
+
+Запуск из корня репозитория (БД и токен бота не нужны):
+
+    python -m benchmarks.bench_dispatch
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.types import Chat, Message, Update
+from aiogram.types import User as TelegramUser
+
+from db_handler.cache import user_cache
+from db_handler.models import User
+from filters.exact import TextEquals
+from middlewares import RegistrationMiddleware
+from utils.dispatch_index import install_dispatch_index
+
+HANDLERS_PER_ROUTER = 10
+ROUTER_COUNTS = (1, 9, 30)  # в боте 9 роутеров
+UPDATES = 3000
+
+TELEGRAM_USER = TelegramUser(id=1, is_bot=False, first_name="Иван")
+CHAT = Chat(id=1, type="private")
+
+
+async def _noop(message: Message) -> None:
+    pass
+
+
+def _build_dispatcher(routers: int, indexed: bool) -> Dispatcher:
+    """Роутеры с хендлерами TextEquals(...) и одним startswith-хендлером."""
+    dp = Dispatcher()
+    for r in range(routers):
+        router = Router(name=f"router_{r}")
+        for h in range(HANDLERS_PER_ROUTER):
+            router.message.register(_noop, TextEquals(f"Кнопка {r}-{h}"))
+        router.message.register(_noop, F.text.startswith(f"/cmd_{r}"))
+        dp.include_router(router)
+    if indexed:
+        install_dispatch_index(dp)
+    return dp
+
+
+def _message(text: str) -> Message:
+    return Message(
+        message_id=1, date=datetime.now(), chat=CHAT, from_user=TELEGRAM_USER, text=text
+    )
+
+
+async def bench_dispatch(bot: Bot) -> None:
+    print("1. Диспетчеризация апдейта (мкс на апдейт, кнопки по кругу)")
+    print(f"{'хендлеров':>10} {'trigger':>10} {'индекс':>10} {'ускорение':>10}")
+    for routers in ROUTER_COUNTS:
+        texts = [
+            f"Кнопка {r}-{h}"
+            for r in range(routers)
+            for h in range(HANDLERS_PER_ROUTER)
+        ]
+        updates = [
+            Update(update_id=i, message=_message(texts[i % len(texts)]))
+            for i in range(UPDATES)
+        ]
+        results = []
+        for indexed in (False, True):
+            dp = _build_dispatcher(routers, indexed)
+            for update in updates[:100]:  # прогрев
+                await dp.feed_update(bot, update)
+            started = time.perf_counter()
+            for update in updates:
+                await dp.feed_update(bot, update)
+            results.append((time.perf_counter() - started) / UPDATES * 1e6)
+
+        linear, indexed_time = results
+        print(
+            f"{routers * (HANDLERS_PER_ROUTER + 1):>10} {linear:>10.1f} "
+            f"{indexed_time:>10.1f} {linear / indexed_time:>9.1f}x"
+        )
+
+
+class _FakeDB:
+    """Загрузка пользователя без БД, со счётчиком запросов."""
+
+    def __init__(self, user: User) -> None:
+        self.user = user
+        self.queries = 0
+
+    async def get_user_with_roles(self, user_id: int) -> User:
+        self.queries += 1
+        return self.user
+
+
+async def bench_user_cache() -> None:
+    async def handler(message: Message, user: User) -> None:
+        pass
+
+    middleware = RegistrationMiddleware()
+    user = User(user_id=TELEGRAM_USER.id, last_seen_at=datetime.now())
+    db = _FakeDB(user)
+    event = _message("Кнопка")
+    handler_object = HandlerObject(callback=handler)
+
+    async def call_handler(event: Message, data: dict) -> None:
+        pass
+
+    print("\n2. RegistrationMiddleware (мкс на апдейт без учёта времени ответа БД)")
+    for cached in (True, False):
+        db.queries = 0
+        user_cache.clear()
+        started = time.perf_counter()
+        for _ in range(UPDATES):
+            if cached:
+                user_cache.set(user.user_id, user)
+            else:
+                user_cache.invalidate(user.user_id)
+            data = {
+                "event_from_user": TELEGRAM_USER,
+                "db": db,
+                "raw_state": None,
+                "handler": handler_object,
+            }
+            await middleware(call_handler, event, data)
+        elapsed = (time.perf_counter() - started) / UPDATES * 1e6
+        name = "пользователь в кэше" if cached else "загрузка из БД"
+        print(
+            f"{name:>20}: {elapsed:6.1f} мкс, "
+            f"запросов к БД на апдейт: {db.queries / UPDATES:.0f}"
+        )
+
+
+async def main() -> None:
+    bot = Bot("42:TEST")
+    try:
+        await bench_dispatch(bot)
+        await bench_user_cache()
+    finally:
+        await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""
+Бенчмарк рассылки напоминаний о днях рождения.
+
+10 000 получателей × 5 именинников с фейковым ботом (без сети и БД).
+Сравниваются:
+
+- прежний подход: текст, возраст, блок реквизитов и клавиатура
+  собираются заново для каждой пары получатель × именинник,
+  сообщения отправляются по очереди;
+- текущий: _render_reminder один раз на именинника и _send_reminders
+  (получатели пачками из iter_ids, отправка пулом Broadcaster).
+
+С мгновенным ботом измеряются затраты CPU на подготовку и отправку,
+с задержкой ответа бота — время рассылки. В боте время рассылки
+ограничено лимитом Bot API (~30 сообщений в секунду) в обоих случаях,
+поэтому главный выигрыш — CPU.
+
+Запуск из корня репозитория:
+
+    python -m benchmarks.bench_reminders
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from db_handler.models import User
+from db_handler.repositories.user import ID_CHUNK_SIZE
+from keyboards.birthday_keyboards import get_birthday_actions_keyboard
+from scheduler_functions.birthday_notification import (
+    BIRTHDAY_NOTIFICATION_TOMORROW,
+    _render_payment_block,
+    _render_reminder,
+    _send_reminders,
+)
+
+RECIPIENTS = 10_000
+BIRTHDAYS = 5
+COLLECTORS = 10
+LATENCY = 0.005
+LATENCY_RECIPIENTS = 1_000
+
+
+class _FakeBot:
+    """Бот, который «отправляет» сообщение за latency секунд."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.sent = 0
+
+    async def send_message(self, chat_id: int, text: str, reply_markup=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sent += 1
+        return SimpleNamespace(message_id=self.sent)
+
+
+class _FakeReminders:
+    async def add_many(self, reminders: list[dict]) -> None:
+        pass
+
+
+class _FakeUsers:
+    def __init__(self, recipients: int) -> None:
+        self.recipients = recipients
+
+    async def iter_ids(self, chunk_size: int = ID_CHUNK_SIZE) -> AsyncIterator[list[int]]:
+        for start in range(1, self.recipients + 1, chunk_size):
+            yield list(range(start, min(start + chunk_size, self.recipients + 1)))
+
+
+class _FakeDB:
+    def __init__(self, recipients: int) -> None:
+        self.users = _FakeUsers(recipients)
+        self.reminders = _FakeReminders()
+
+    async def set_delivery_statuses(self, statuses: dict[int, str]) -> None:
+        pass
+
+
+def _birthday_users() -> list[User]:
+    return [
+        User(
+            user_id=user_id,
+            last_name="Иванов",
+            first_name="Иван",
+            patronymic="Иванович",
+            birth_date=date(1990 - user_id, 1, 1),
+        )
+        for user_id in range(1, BIRTHDAYS + 1)
+    ]
+
+
+async def _per_recipient(
+    bot: _FakeBot, db: _FakeDB, birthday_users: list[User], collector_ids: set[int]
+) -> None:
+    """Прежний подход: всё собирается заново для каждого получателя."""
+    target_date = datetime.now() + timedelta(days=1)
+    async for recipient_ids in db.users.iter_ids():
+        for birthday_user in birthday_users:
+            for recipient_id in recipient_ids:
+                if recipient_id == birthday_user.user_id:
+                    continue
+                age_info = ""
+                if recipient_id in collector_ids:
+                    age = target_date.year - birthday_user.birth_date.year
+                    if age % 10 == 0:
+                        age_info = f"\n\n<b>🎊 Юбилей - {age} лет!</b>\n"
+                    else:
+                        age_info = f"\n\nИсполняется: <b>{age} лет</b>\n"
+                message = BIRTHDAY_NOTIFICATION_TOMORROW.format(
+                    date=target_date.strftime("%d.%m"),
+                    full_name=birthday_user.full_name,
+                    payment_block=_render_payment_block(None),
+                )
+                if age_info:
+                    message = message.rstrip() + age_info
+                await bot.send_message(
+                    recipient_id,
+                    message,
+                    reply_markup=get_birthday_actions_keyboard(birthday_user.user_id),
+                )
+
+
+async def _render_once(
+    bot: _FakeBot, db: _FakeDB, birthday_users: list[User], collector_ids: set[int]
+) -> None:
+    """Текущий подход из send_birthday_notifications."""
+    target_date = datetime.now() + timedelta(days=1)
+    payment_block = _render_payment_block(None)
+    reminders = [
+        _render_reminder(birthday_user, target_date, 1, payment_block)
+        for birthday_user in birthday_users
+    ]
+
+    def reminders_for(chat_id: int):
+        return [r for r in reminders if r.birthday_user_id != chat_id]
+
+    await _send_reminders(bot, db, collector_ids, reminders_for)
+
+
+async def _measure(variant, recipients: int, latency: float) -> tuple[float, float, int]:
+    bot = _FakeBot(latency)
+    db = _FakeDB(recipients)
+    collector_ids = set(range(1, COLLECTORS + 1))
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    await variant(bot, db, _birthday_users(), collector_ids)
+    return time.perf_counter() - started, time.process_time() - cpu_started, bot.sent
+
+
+async def main() -> None:
+    variants = (
+        ("на каждого получателя", _per_recipient),
+        ("один раз на именинника", _render_once),
+    )
+    runs = (
+        (RECIPIENTS, 0.0, "мгновенный бот"),
+        (LATENCY_RECIPIENTS, LATENCY, f"ответ бота {LATENCY * 1000:.0f} мс"),
+    )
+    for recipients, latency, title in runs:
+        print(f"{recipients} получателей × {BIRTHDAYS} именинников, {title}")
+        print(f"{'вариант':>24} {'время, с':>10} {'CPU, с':>8} {'сообщений':>10}")
+        for name, variant in variants:
+            elapsed, cpu, sent = await _measure(variant, recipients, latency)
+            print(f"{name:>24} {elapsed:>10.2f} {cpu:>8.2f} {sent:>10}")
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,6 @@
 from functools import lru_cache
 
-from pydantic import Field, computed_field
+from pydantic import Field, computed_field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -47,6 +47,57 @@ class Settings(BaseSettings):
     # === Scheduler ===
     timezone: str = Field(default="Europe/Moscow")
 
+    # === Throttling (token bucket на пользователя) ===
+    # rate — запросов в секунду, burst — сколько можно сделать подряд
+    throttle_rate: float = Field(default=1.0, alias="THROTTLE_RATE")
+    throttle_burst: int = Field(default=5, alias="THROTTLE_BURST")
+    # Для тяжёлых хендлеров (полный список пользователей и т.п.)
+    throttle_heavy_rate: float = Field(default=0.1, alias="THROTTLE_HEAVY_RATE")
+    throttle_heavy_burst: int = Field(default=2, alias="THROTTLE_HEAVY_BURST")
+
+    # === Обработка апдейтов ===
+    # Сколько апдейтов обрабатывается одновременно (остальные ждут в Telegram)
+    updates_concurrency: int = Field(default=100, alias="UPDATES_CONCURRENCY")
+    # Сколько хендлеров выполняется одновременно (не больше размера пула БД)
+    handlers_concurrency: int = Field(default=10, alias="HANDLERS_CONCURRENCY")
+    # Сколько апдейтов может ждать в очереди, остальным — "бот перегружен".
+    # Меньше UPDATES_CONCURRENCY - HANDLERS_CONCURRENCY, иначе очередь
+    # не заполнится и перегрузка не будет отсекаться
+    handlers_queue_size: int = Field(default=50, alias="HANDLERS_QUEUE_SIZE")
+
+    # === Лимиты запросов к Bot API (RequestLimiterMiddleware) ===
+    # Сообщений в секунду от бота всего и в один личный чат
+    bot_api_rate: float = Field(default=30.0, alias="BOT_API_RATE")
+    bot_api_chat_rate: float = Field(default=1.0, alias="BOT_API_CHAT_RATE")
+
+    # === Очередь отправки сообщений (utils.outbox) ===
+    # Сколько сообщений другим пользователям отправляется одновременно
+    outbox_workers: int = Field(default=4, alias="OUTBOX_WORKERS")
+    # Хранить очередь в БД, чтобы сообщения не терялись при перезапуске
+    outbox_persist: bool = Field(default=False, alias="OUTBOX_PERSIST")
+
+    # === Напоминания о днях рождения ===
+    # Одно сообщение на получателя со всеми ДР завтра и через неделю
+    birthday_digest: bool = Field(default=False, alias="BIRTHDAY_DIGEST")
+    # Общий чат команды: напоминание публикуется в нём один раз,
+    # в личные сообщения — только коллекторам
+    announcement_chat_id: int | None = Field(
+        default=None, alias="ANNOUNCEMENT_CHAT_ID"
+    )
+
+    @model_validator(mode="after")
+    def check_handlers_queue(self) -> "Settings":
+        """Очередь хендлеров должна заполняться раньше, чем пул апдейтов."""
+        waiting = self.updates_concurrency - self.handlers_concurrency
+        if self.handlers_queue_size >= waiting:
+            raise ValueError(
+                f"HANDLERS_QUEUE_SIZE ({self.handlers_queue_size}) должен быть "
+                f"меньше UPDATES_CONCURRENCY - HANDLERS_CONCURRENCY ({waiting}): "
+                "в обработке одновременно не больше UPDATES_CONCURRENCY апдейтов, "
+                "и большая очередь никогда не заполнится"
+            )
+        return self
+
 
 @lru_cache
 def get_settings() -> Settings:
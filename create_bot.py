@@ -7,6 +7,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from config import get_settings
 from db_handler import PostgresHandler
+from middlewares import RequestLimiterMiddleware
+from utils.event_isolation import UserEventIsolation
+from utils.outbox import Outbox
 
 # Загружаем настройки (валидация происходит здесь!)
 settings = get_settings()
@@ -25,4 +28,24 @@ bot = Bot(
     token=settings.bot_token,
     default=DefaultBotProperties(parse_mode=ParseMode.HTML),
 )
-dp = Dispatcher(storage=MemoryStorage())
+# Общий лимит исходящих запросов: ответы хендлеров, рассылки и напоминания
+# не превышают лимиты Telegram вместе, а 429 и сетевые ошибки идемпотентных
+# запросов повторяются
+request_limiter = RequestLimiterMiddleware(
+    global_limit=(settings.bot_api_rate, int(settings.bot_api_rate)),
+    # Редактирование, закрепление и удаление — не больше половины лимита,
+    # чтобы массовое открепление не вытесняло отправку сообщений
+    limits={
+        "send": (settings.bot_api_rate, int(settings.bot_api_rate)),
+        "edit": (settings.bot_api_rate / 2, int(settings.bot_api_rate / 2)),
+    },
+    chat_limit=(settings.bot_api_chat_rate, 3),
+)
+bot.session.middleware(request_limiter)
+# Апдейты обрабатываются параллельно, апдейты одного пользователя —
+# последовательно (см. UserEventIsolation)
+dp = Dispatcher(storage=MemoryStorage(), events_isolation=UserEventIsolation())
+# Сообщения другим пользователям отправляются из очереди в фоне
+outbox = Outbox(
+    bot, pg_db, workers=settings.outbox_workers, persist=settings.outbox_persist
+)
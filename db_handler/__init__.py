@@ -1,5 +1,16 @@
 from .database import PostgresHandler
-from .models import User, Wish, Transfer, Administrator, Collector, ServiceUser
+from .models import (
+    User,
+    Wish,
+    Transfer,
+    Administrator,
+    Collector,
+    ServiceUser,
+    BroadcastJob,
+    BroadcastDelivery,
+    ReminderMessage,
+    OutboxMessage,
+)
 
 __all__ = [
     "PostgresHandler",
@@ -9,5 +20,9 @@ __all__ = [
     "Administrator",
     "Collector",
     "ServiceUser",
+    "BroadcastJob",
+    "BroadcastDelivery",
+    "ReminderMessage",
+    "OutboxMessage",
 ]
 
@@ -0,0 +1,30 @@
+"""
+Кэши данных БД, общие для всего процесса.
+
+Репозитории инвалидируют записи при изменении данных,
+middleware читают из кэша вместо обращения к БД.
+"""
+
+from utils.cache import TTLCache, ValueCache
+
+from .models import Collector, User
+
+USER_CACHE_MAXSIZE = 5000
+USER_CACHE_TTL = 300  # секунд
+UNREGISTERED_CACHE_MAXSIZE = 10000
+UNREGISTERED_CACHE_TTL = 60  # секунд
+
+# Зарегистрированные пользователи (User с загруженными ролями) по user_id
+user_cache: TTLCache[int, User] = TTLCache(
+    maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL
+)
+
+# Незарегистрированные user_id (негативный кэш): повторные апдейты от них
+# не доходят до БД в течение TTL. Сбрасывается в UserRepository.add.
+unregistered_cache: TTLCache[int, bool] = TTLCache(
+    maxsize=UNREGISTERED_CACHE_MAXSIZE, ttl=UNREGISTERED_CACHE_TTL
+)
+
+# Активный коллектор (Collector с загруженным user) или None, если не назначен.
+# Меняется только через CollectorRepository и удаление/изменение пользователя.
+active_collector_cache: ValueCache[Collector | None] = ValueCache()
@@ -14,6 +14,9 @@ from .repositories import (
     AdminRepository,
     CollectorRepository,
     ServiceUserRepository,
+    BroadcastRepository,
+    ReminderRepository,
+    OutboxRepository,
 )
 
 logger = logging.getLogger(__name__)
@@ -39,6 +42,9 @@ class PostgresHandler:
         self.admins: AdminRepository | None = None
         self.collectors: CollectorRepository | None = None
         self.service_users: ServiceUserRepository | None = None
+        self.broadcasts: BroadcastRepository | None = None
+        self.reminders: ReminderRepository | None = None
+        self.outbox: OutboxRepository | None = None
 
     async def create_pool(self) -> None:
         """Инициализация подключения и репозиториев."""
@@ -53,6 +59,9 @@ class PostgresHandler:
         self.admins = AdminRepository(session_factory)
         self.collectors = CollectorRepository(session_factory)
         self.service_users = ServiceUserRepository(session_factory)
+        self.broadcasts = BroadcastRepository(session_factory)
+        self.reminders = ReminderRepository(session_factory)
+        self.outbox = OutboxRepository(session_factory)
 
         logger.info("✅ All repositories initialized")
 
@@ -60,6 +69,16 @@ class PostgresHandler:
         """Закрытие подключения."""
         await self._session.disconnect()
 
+    def request_scope(self):
+        """
+        Unit of work одного апдейта: все репозитории внутри блока
+        используют одну сессию, commit/rollback — в конце блока.
+
+            async with db.request_scope():
+                await db.users.get(user_id)
+        """
+        return self._session.request_scope()
+
     async def init_data(self, service_user_id: int) -> None:
         """
         Инициализация начальных данных.
@@ -81,6 +100,9 @@ class PostgresHandler:
     async def get_user(self, user_id: int):
         return await self.users.get(user_id)
 
+    async def get_user_with_roles(self, user_id: int):
+        return await self.users.get_with_roles(user_id)
+
     async def add_user(self, **kwargs):
         return await self.users.add(**kwargs)
 
@@ -90,8 +112,15 @@ class PostgresHandler:
     async def delete_user(self, user_id: int):
         return await self.users.delete(user_id)
 
-    async def get_all_users(self, with_transfers: bool = False):
-        return await self.users.get_all(with_transfers=with_transfers)
+    async def get_all_users(
+        self, with_transfers: bool = False, deliverable_only: bool = False
+    ):
+        return await self.users.get_all(
+            with_transfers=with_transfers, deliverable_only=deliverable_only
+        )
+
+    async def set_delivery_statuses(self, statuses: dict[int, str | None]):
+        return await self.users.set_delivery_statuses(statuses)
 
     async def get_wish(self, wish_id: int):
         return await self.wishes.get(wish_id)
@@ -9,6 +9,10 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Numeric,
+    Index,
+    SmallInteger,
+    Computed,
+    text,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import DeclarativeMeta, relationship, Mapped
@@ -22,12 +26,31 @@ class User(Base):
 
     __tablename__ = "users"
 
+    # Причины, по которым сообщения пользователю не доставляются
+    DELIVERY_BLOCKED = "blocked"  # Заблокировал бота
+    DELIVERY_CHAT_NOT_FOUND = "chat_not_found"
+
     user_id = Column(BigInteger, primary_key=True)
     username = Column(String(32), unique=True)
     first_name = Column(String(64))
     last_name = Column(String(64))
     patronymic = Column(String(64))
     birth_date = Column(Date)
+    # Месяц и день рождения как MMDD (0229, 1231) — для календарных запросов
+    # диапазоном по индексу; вычисляется PostgreSQL из birth_date
+    birth_mmdd = Column(
+        SmallInteger,
+        Computed(
+            "(EXTRACT(MONTH FROM birth_date) * 100"
+            " + EXTRACT(DAY FROM birth_date))::smallint",
+            persisted=True,
+        ),
+        index=True,
+    )
+    # None — сообщения доставляются; сбрасывается, когда пользователь пишет боту
+    delivery_status = Column(String(20), nullable=True)
+    # Когда пользователь последний раз писал боту (обновляется не чаще раза в час)
+    last_seen_at = Column(DateTime, nullable=True, index=True)
 
     # Связи с другими таблицами
     wishes: Mapped[List["Wish"]] = relationship("Wish", back_populates="user")
@@ -83,6 +106,11 @@ class User(Base):
             return f"Пользователь {self.user_id}"
         return f"{self.last_name} {self.first_name[0]}. {self.patronymic[0]}."
 
+    @property
+    def is_deliverable(self) -> bool:
+        """Можно ли отправлять пользователю сообщения"""
+        return self.delivery_status is None
+
     @property
     def is_admin(self) -> bool:
         """Проверка, является ли пользователь администратором"""
@@ -235,3 +263,126 @@ class ServiceUser(Base):
 
     def __repr__(self):
         return f"ServiceUser(id={self.id}, user_id={self.user_id})"
+
+
+class BroadcastJob(Base):
+    """Модель рассылки администратора
+
+    Статусы доставки по каждому получателю хранятся в BroadcastDelivery,
+    поэтому после перезапуска бота рассылка продолжается с места остановки.
+
+    Открепление и удаление тоже выполняются как рассылки: source_job_id
+    указывает рассылку, чьи сообщения обрабатываются (для открепления
+    None — все закреплённые сообщения рассылок).
+    """
+
+    __tablename__ = "broadcast_jobs"
+
+    # Виды рассылок
+    KIND_PIN = "pin"
+    KIND_UNPIN = "unpin"
+    KIND_DELETE = "delete"
+
+    # Статусы рассылки
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_CANCELLED = "cancelled"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(20), nullable=False)
+    admin_id = Column(BigInteger, nullable=False)  # Кому отправить отчёт
+    text = Column(Text, nullable=True)
+    photo_file_id = Column(Text, nullable=True)
+    document_file_id = Column(Text, nullable=True)
+    status = Column(String(20), nullable=False, default=STATUS_RUNNING)
+    total = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    source_job_id = Column(
+        Integer, ForeignKey("broadcast_jobs.id", ondelete="SET NULL"), nullable=True
+    )
+
+    def __repr__(self):
+        return f"BroadcastJob(id={self.id}, kind={self.kind}, status={self.status})"
+
+
+class BroadcastDelivery(Base):
+    """Модель доставки рассылки одному получателю
+
+    message_id и is_pinned — отправленное сообщение, по ним рассылку
+    можно открепить или удалить только в тех чатах, где она есть.
+    """
+
+    __tablename__ = "broadcast_deliveries"
+    __table_args__ = (
+        # Чаты с закреплёнными сообщениями рассылок (для /unpin)
+        Index(
+            "ix_broadcast_deliveries_pinned",
+            "user_id",
+            postgresql_where=text("is_pinned"),
+        ),
+    )
+
+    # Статусы доставки
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    job_id = Column(
+        Integer,
+        ForeignKey("broadcast_jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    user_id = Column(
+        BigInteger, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True
+    )
+    status = Column(String(10), nullable=False, default=STATUS_PENDING)
+    message_id = Column(BigInteger, nullable=True)
+    is_pinned = Column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"BroadcastDelivery(job={self.job_id}, user={self.user_id}, status={self.status})"
+
+
+class ReminderMessage(Base):
+    """Модель отправленного напоминания о дне рождения
+
+    Хранится до expires_on, после чего сообщение удаляется из чата
+    (вместе с кнопками предложения подарка). Если с sent_at прошло
+    больше 48 часов, удалить его нельзя — убираются только кнопки.
+    """
+
+    __tablename__ = "reminder_messages"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(
+        BigInteger, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False
+    )
+    message_id = Column(BigInteger, nullable=False)
+    birthday_user_id = Column(
+        BigInteger, ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False
+    )
+    sent_at = Column(DateTime, nullable=False)
+    expires_on = Column(Date, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"ReminderMessage(chat={self.chat_id}, message={self.message_id}, expires={self.expires_on})"
+
+
+class OutboxMessage(Base):
+    """Модель сообщения в очереди отправки (utils.outbox.Outbox)
+
+    Хранится, пока сообщение не доставлено, — после перезапуска бота
+    недоставленные сообщения отправляются снова.
+    """
+
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(BigInteger, nullable=False)
+    payload = Column(Text, nullable=False)  # SendMessage в JSON
+    priority = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"OutboxMessage(id={self.id}, chat={self.chat_id}, priority={self.priority})"
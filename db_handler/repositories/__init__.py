@@ -4,6 +4,9 @@ from .transfer import TransferRepository
 from .admin import AdminRepository
 from .collector import CollectorRepository
 from .service_user import ServiceUserRepository
+from .broadcast import BroadcastRepository
+from .reminder import ReminderRepository
+from .outbox import OutboxRepository
 
 __all__ = [
     "UserRepository",
@@ -12,5 +15,8 @@ __all__ = [
     "AdminRepository",
     "CollectorRepository",
     "ServiceUserRepository",
+    "BroadcastRepository",
+    "ReminderRepository",
+    "OutboxRepository",
 ]
 
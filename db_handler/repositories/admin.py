@@ -6,6 +6,7 @@ import logging
 from sqlalchemy import select
 
 from db_handler.models import Administrator
+from db_handler.cache import user_cache
 from exceptions import RecordNotFound, RecordAlreadyExists
 from .base import BaseRepository
 
@@ -21,14 +22,15 @@ class AdminRepository(BaseRepository[Administrator]):
         """Создать администратора."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             existing = await session.get(Administrator, user_id)
             if existing:
                 raise RecordAlreadyExists(entity=Administrator.__name__, entity_id=user_id)
 
             admin = Administrator(user_id=user_id)
             session.add(admin)
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
 
             logger.info(f"✅ Создан администратор для пользователя {user_id}")
             return admin
@@ -37,24 +39,25 @@ class AdminRepository(BaseRepository[Administrator]):
         """Получить администратора по user_id."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             return await self._get_by_user_id(user_id, session)
 
     async def delete(self, user_id: int) -> None:
         """Удалить администратора."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             admin = await self._get_by_user_id(user_id, session)
             await session.delete(admin)
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
             logger.info(f"✅ Admin {user_id} deleted from database")
 
     async def get_all(self) -> list[Administrator]:
         """Получить всех администраторов с загрузкой данных пользователей."""
         from sqlalchemy.orm import selectinload
         
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(Administrator).options(selectinload(Administrator.user))
             )
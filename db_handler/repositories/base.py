@@ -2,12 +2,16 @@
 Базовый репозиторий с общими методами.
 """
 
-from typing import TypeVar, Generic
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar, Generic
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
 
 from db_handler.models import Base
+from db_handler.session import get_request_scope
 from exceptions import RecordNotFound
 
 T = TypeVar("T", bound=Base)
@@ -21,6 +25,85 @@ class BaseRepository(Generic[T]):
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self._session_factory = session_factory
 
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Сессия для операции репозитория.
+
+        Внутри апдейта — общая сессия unit of work (см. RequestScope),
+        иначе (планировщик, фоновые задачи) — собственная сессия.
+
+        Если апдейт уже изменял данные, операция выполняется в SAVEPOINT:
+        после ошибки БД (её может перехватить хендлер) откатывается только
+        она, а изменения апдейта сохраняются и фиксируются вместе.
+        """
+        scope = get_request_scope()
+        if scope is None:
+            async with self._session_factory() as session:
+                yield session
+            return
+
+        session = scope.get_session()
+        if not scope.has_writes:
+            # Терять нечего: транзакция апдейта после ошибки БД непригодна
+            # и откатывается целиком (без лишних запросов SAVEPOINT)
+            try:
+                yield session
+            except SQLAlchemyError:
+                await scope.rollback()
+                raise
+            return
+
+        savepoint = await session.begin_nested()
+        try:
+            yield session
+        except SQLAlchemyError:
+            await savepoint.rollback()
+            raise
+        if savepoint.is_active:
+            await savepoint.commit()
+
+    async def _commit(self, session: AsyncSession) -> None:
+        """
+        Зафиксировать изменения.
+
+        Внутри апдейта изменения только отправляются в БД (flush),
+        commit выполняется один раз в конце апдейта.
+        """
+        scope = get_request_scope()
+        if scope is None:
+            await session.commit()
+        else:
+            await session.flush()
+            scope.has_writes = True
+
+    def _on_commit(self, callback: Callable[..., Any], *args: Any) -> None:
+        """
+        Выполнить callback (инвалидацию кэша) после изменения данных.
+
+        Вызывается сразу и, внутри апдейта, повторно после commit —
+        чтобы параллельные апдейты не закэшировали старые данные,
+        прочитанные до фиксации транзакции.
+        """
+        callback(*args)
+        scope = get_request_scope()
+        if scope is not None:
+            scope.after_commit(lambda: callback(*args))
+
+    @staticmethod
+    def _detach(session: AsyncSession, *objects: Base | None) -> None:
+        """
+        Отсоединить объекты от сессии перед кэшированием.
+
+        Объекты из кэшей процесса используются параллельными апдейтами:
+        commit или rollback загрузившей их сессии не должен их экспайрить,
+        а изменения в другом апдейте — попадать в общий объект.
+        Загруженные атрибуты остаются доступны, ленивые связи — нет.
+        """
+        for obj in objects:
+            if obj is not None and obj in session:
+                session.expunge(obj)
+
     async def _get_by_user_id(
         self,
         user_id: int,
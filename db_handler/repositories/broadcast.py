@@ -0,0 +1,237 @@
+"""
+Репозиторий для работы с рассылками.
+"""
+
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy import select, insert, update, func, literal, null
+
+from db_handler.models import BroadcastJob, BroadcastDelivery, User
+from exceptions import RecordNotFound
+from .base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+# Сколько получателей читается из курсора за раз
+PENDING_CHUNK_SIZE = 1000
+
+
+class BroadcastRepository(BaseRepository[BroadcastJob]):
+    """Репозиторий для работы с рассылками и статусами доставки."""
+
+    model = BroadcastJob
+
+    async def create_job(
+        self,
+        kind: str,
+        admin_id: int,
+        text: str | None = None,
+        photo_file_id: str | None = None,
+        document_file_id: str | None = None,
+        source_job_id: int | None = None,
+        user_ids: list[int] | None = None,
+    ) -> BroadcastJob:
+        """
+        Создать рассылку с получателями в статусе pending.
+
+        Получатели (кроме тех, кому сообщения не доставляются):
+        - KIND_PIN — пользователи user_ids (сегмент, см.
+          UserRepository.get_*_ids) или все зарегистрированные пользователи;
+        - KIND_UNPIN — чаты с закреплённым сообщением рассылки
+          source_job_id (или любой рассылки, если он не указан);
+        - KIND_DELETE — чаты, получившие сообщение рассылки source_job_id.
+
+        Получатели добавляются одним INSERT ... SELECT. Рассылка
+        фиксируется в отдельной транзакции (не в unit of work апдейта),
+        чтобы фоновая задача сразу видела её получателей.
+        """
+        async with self._session_factory() as session:
+            job = BroadcastJob(
+                kind=kind,
+                admin_id=int(admin_id),
+                text=text,
+                photo_file_id=photo_file_id,
+                document_file_id=document_file_id,
+                source_job_id=source_job_id,
+                status=BroadcastJob.STATUS_RUNNING,
+                created_at=datetime.now(),
+            )
+            session.add(job)
+            await session.flush()
+
+            if user_ids is None:
+                result = await session.execute(
+                    insert(BroadcastDelivery).from_select(
+                        ["job_id", "user_id", "status", "message_id"],
+                        self._recipients_query(job),
+                    )
+                )
+                job.total = result.rowcount
+            else:
+                if user_ids:
+                    await session.execute(
+                        insert(BroadcastDelivery),
+                        [
+                            {
+                                "job_id": job.id,
+                                "user_id": user_id,
+                                "status": BroadcastDelivery.STATUS_PENDING,
+                            }
+                            for user_id in user_ids
+                        ],
+                    )
+                job.total = len(user_ids)
+            await session.commit()
+
+            logger.info(f"✅ Создана рассылка {job.id} ({kind}), получателей: {job.total}")
+            return job
+
+    @staticmethod
+    def _recipients_query(job: BroadcastJob):
+        """SELECT (job_id, user_id, status, message_id) получателей рассылки."""
+        job_id = literal(job.id)
+        pending = literal(BroadcastDelivery.STATUS_PENDING)
+
+        if job.kind == BroadcastJob.KIND_PIN:
+            return select(job_id, User.user_id, pending, null()).where(
+                User.delivery_status.is_(None)
+            )
+
+        if job.source_job_id is None:
+            # Все закреплённые сообщения рассылок: каждый чат открепляется целиком
+            query = (
+                select(job_id, BroadcastDelivery.user_id, pending, null())
+                .where(BroadcastDelivery.is_pinned.is_(True))
+                .distinct()
+            )
+        else:
+            query = select(
+                job_id, BroadcastDelivery.user_id, pending, BroadcastDelivery.message_id
+            ).where(BroadcastDelivery.job_id == job.source_job_id)
+            if job.kind == BroadcastJob.KIND_UNPIN:
+                query = query.where(BroadcastDelivery.is_pinned.is_(True))
+            else:
+                query = query.where(BroadcastDelivery.message_id.is_not(None))
+
+        return query.join(User, User.user_id == BroadcastDelivery.user_id).where(
+            User.delivery_status.is_(None)
+        )
+
+    async def get(self, job_id: int) -> BroadcastJob:
+        """Получить рассылку по ID."""
+        async with self._session() as session:
+            job = await session.get(BroadcastJob, job_id)
+            if not job:
+                raise RecordNotFound(entity=BroadcastJob.__name__, entity_id=job_id)
+            return job
+
+    async def get_unfinished(self) -> list[BroadcastJob]:
+        """Получить незавершённые рассылки (в порядке создания)."""
+        async with self._session() as session:
+            result = await session.execute(
+                select(BroadcastJob)
+                .where(BroadcastJob.status == BroadcastJob.STATUS_RUNNING)
+                .order_by(BroadcastJob.id)
+            )
+            return list(result.scalars().all())
+
+    async def iter_pending(
+        self, job_id: int, chunk_size: int = PENDING_CHUNK_SIZE
+    ) -> AsyncIterator[dict[int, int | None]]:
+        """
+        Перебрать пачками получателей, которым рассылка ещё не доставлялась.
+
+        Получатели читаются из серверного курсора (stream + yield_per)
+        в отдельной сессии: в памяти находится не больше одной пачки.
+
+        Yields:
+            {user_id: message_id обрабатываемого сообщения (для открепления
+            и удаления) или None}
+        """
+        async with self._session_factory() as session:
+            result = await session.stream(
+                select(BroadcastDelivery.user_id, BroadcastDelivery.message_id)
+                .where(
+                    BroadcastDelivery.job_id == job_id,
+                    BroadcastDelivery.status == BroadcastDelivery.STATUS_PENDING,
+                )
+                .order_by(BroadcastDelivery.user_id)
+                .execution_options(yield_per=chunk_size)
+            )
+            async for chunk in result.partitions():
+                yield dict(chunk)
+
+    async def save_deliveries(self, job_id: int, deliveries: list[dict]) -> None:
+        """
+        Записать результаты доставки пачкой (UPDATE по первичному ключу).
+
+        Args:
+            job_id: ID рассылки
+            deliveries: [{"user_id", "status", "message_id", "is_pinned"}]
+        """
+        if not deliveries:
+            return
+
+        async with self._session() as session:
+            await session.execute(
+                update(BroadcastDelivery),
+                [{"job_id": job_id, **delivery} for delivery in deliveries],
+            )
+            await self._commit(session)
+
+    async def release_messages(
+        self, source_job_id: int | None, user_ids: list[int], deleted: bool = False
+    ) -> None:
+        """
+        Отметить сообщения рассылки source_job_id откреплёнными
+        (и удалёнными, если deleted) в чатах user_ids.
+
+        source_job_id=None — все сообщения рассылок в этих чатах.
+        """
+        if not user_ids:
+            return
+
+        values: dict = {"is_pinned": False}
+        if deleted:
+            values["message_id"] = None
+
+        query = update(BroadcastDelivery).where(BroadcastDelivery.user_id.in_(user_ids))
+        if source_job_id is not None:
+            query = query.where(BroadcastDelivery.job_id == source_job_id)
+
+        async with self._session() as session:
+            await session.execute(query.values(**values))
+            await self._commit(session)
+
+    async def count_deliveries(self, job_id: int) -> dict[str, int]:
+        """Количество доставок рассылки по статусам и закреплённых ("pinned")."""
+        async with self._session() as session:
+            result = await session.execute(
+                select(BroadcastDelivery.status, func.count())
+                .where(BroadcastDelivery.job_id == job_id)
+                .group_by(BroadcastDelivery.status)
+            )
+            counts = {status: count for status, count in result.all()}
+
+            counts["pinned"] = await session.scalar(
+                select(func.count()).where(
+                    BroadcastDelivery.job_id == job_id,
+                    BroadcastDelivery.is_pinned.is_(True),
+                )
+            )
+            return counts
+
+    async def finish(
+        self, job_id: int, status: str = BroadcastJob.STATUS_DONE
+    ) -> None:
+        """Отметить рассылку завершённой (или остановленной)."""
+        async with self._session() as session:
+            await session.execute(
+                update(BroadcastJob)
+                .where(BroadcastJob.id == job_id)
+                .values(status=status, finished_at=datetime.now())
+            )
+            await self._commit(session)
+            logger.info(f"✅ Рассылка {job_id} завершена ({status})")
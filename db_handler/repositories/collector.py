@@ -7,6 +7,8 @@ from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
 from db_handler.models import Collector
+from db_handler.cache import user_cache, active_collector_cache
+from utils.cache import MISSING
 from exceptions import RecordNotFound, RecordAlreadyExists, CollectorUniquenessError
 from .base import BaseRepository
 
@@ -27,7 +29,7 @@ class CollectorRepository(BaseRepository[Collector]):
         """Создать коллектора (неактивного)."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             existing = await session.execute(
                 select(Collector).where(Collector.user_id == user_id)
             )
@@ -41,8 +43,10 @@ class CollectorRepository(BaseRepository[Collector]):
                 is_active=False,
             )
             session.add(collector)
-            await session.commit()
+            await self._commit(session)
             await session.refresh(collector)
+            self._on_commit(user_cache.invalidate, user_id)
+            self._on_commit(active_collector_cache.invalidate)
 
             logger.info(f"✅ Создан неактивный коллектор для пользователя {user_id}")
             return collector
@@ -51,12 +55,12 @@ class CollectorRepository(BaseRepository[Collector]):
         """Получить коллектора по user_id."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             return await self._get_by_user_id(user_id, session, load_user=True)
 
     async def get_all(self) -> list[Collector]:
         """Получить всех коллекторов с данными пользователей."""
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(Collector).options(selectinload(Collector.user))
             )
@@ -71,7 +75,7 @@ class CollectorRepository(BaseRepository[Collector]):
         """Обновить данные коллектора."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             collector = await self._get_by_user_id(user_id, session)
 
             if phone_number is not None:
@@ -79,35 +83,44 @@ class CollectorRepository(BaseRepository[Collector]):
             if bank_name is not None:
                 collector.bank_name = bank_name
 
-            await session.commit()
+            await self._commit(session)
             await session.refresh(collector)
+            self._on_commit(user_cache.invalidate, user_id)
+            self._on_commit(active_collector_cache.invalidate)
 
             logger.info(f"✅ Обновлен коллектор для пользователя {user_id}")
             return collector
 
     async def get_active(self) -> Collector:
-        """Получить активного коллектора."""
-        async with self._session_factory() as session:
-            result = await session.execute(
-                select(Collector)
-                .options(selectinload(Collector.user))
-                .where(Collector.is_active == True)
-            )
-            collector = result.scalar_one_or_none()
-
-            if not collector:
-                raise RecordNotFound(
-                    message="Активный коллектор не найден",
-                    entity=Collector.__name__,
+        """Получить активного коллектора (кэшируется до изменения коллекторов)."""
+        collector = active_collector_cache.get()
+        if collector is MISSING:
+            cache_version = active_collector_cache.version
+            async with self._session() as session:
+                # Связи пользователя не нужны: в кэше только коллектор и user
+                result = await session.execute(
+                    select(Collector)
+                    .options(selectinload(Collector.user).lazyload("*"))
+                    .where(Collector.is_active == True)
                 )
+                collector = result.scalar_one_or_none()
+                if collector is not None:
+                    self._detach(session, collector, collector.user)
+            active_collector_cache.set(collector, version=cache_version)
+
+        if not collector:
+            raise RecordNotFound(
+                message="Активный коллектор не найден",
+                entity=Collector.__name__,
+            )
 
-            return collector
+        return collector
 
     async def set_active(self, user_id: int) -> Collector:
         """Назначить активного коллектора."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             # Проверяем существование коллектора с загрузкой пользователя
             result = await session.execute(
                 select(Collector)
@@ -120,13 +133,18 @@ class CollectorRepository(BaseRepository[Collector]):
                 raise RecordNotFound(entity=Collector.__name__, entity_id=user_id)
 
             # Деактивируем текущего
-            await self._deactivate_current(session)
+            previous_user_id = await self._deactivate_current(session)
 
             # Активируем нового
             collector.is_active = True
-            await session.commit()
+            await self._commit(session)
             await session.refresh(collector)
 
+            self._on_commit(user_cache.invalidate, user_id)
+            if previous_user_id is not None:
+                self._on_commit(user_cache.invalidate, previous_user_id)
+            self._on_commit(active_collector_cache.invalidate)
+
             logger.info(f"✅ Коллектор {user_id} назначен активным")
 
             # Проверяем единственность
@@ -134,8 +152,12 @@ class CollectorRepository(BaseRepository[Collector]):
 
             return collector
 
-    async def _deactivate_current(self, session) -> None:
-        """Деактивировать текущего активного коллектора."""
+    async def _deactivate_current(self, session) -> int | None:
+        """Деактивировать текущего активного коллектора.
+
+        Returns:
+            user_id деактивированного коллектора или None
+        """
         result = await session.execute(
             select(Collector).where(Collector.is_active == True)
         )
@@ -144,10 +166,13 @@ class CollectorRepository(BaseRepository[Collector]):
         if collector:
             collector.is_active = False
             logger.info(f"Деактивирован коллектор {collector.user_id}")
+            return collector.user_id
+
+        return None
 
     async def _validate_single_active(self) -> None:
         """Проверить, что активен только один коллектор."""
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(func.count(Collector.id)).where(Collector.is_active == True)
             )
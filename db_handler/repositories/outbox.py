@@ -0,0 +1,55 @@
+"""
+Репозиторий для работы с очередью отправки сообщений.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, delete
+
+from db_handler.models import OutboxMessage
+from .base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRepository(BaseRepository[OutboxMessage]):
+    """
+    Репозиторий для работы с очередью отправки сообщений.
+
+    Внутри апдейта запись добавляется в его unit of work и фиксируется
+    вместе с остальными изменениями: при откате апдейта сообщение не
+    сохраняется и не отправляется (в очередь воркеров оно попадает после
+    commit, см. Outbox.send).
+    """
+
+    model = OutboxMessage
+
+    async def add(self, chat_id: int, payload: str, priority: int) -> int:
+        """Сохранить сообщение в очереди. Возвращает ID записи."""
+        async with self._session() as session:
+            message = OutboxMessage(
+                chat_id=int(chat_id),
+                payload=payload,
+                priority=priority,
+                created_at=datetime.now(),
+            )
+            session.add(message)
+            await self._commit(session)
+            return message.id
+
+    async def get_all(self) -> list[OutboxMessage]:
+        """Получить недоставленные сообщения (в порядке приоритета и постановки)."""
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(OutboxMessage).order_by(OutboxMessage.priority, OutboxMessage.id)
+            )
+            return list(result.scalars().all())
+
+    async def delete(self, message_id: int) -> None:
+        """Удалить доставленное (или отброшенное) сообщение из очереди."""
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(OutboxMessage).where(OutboxMessage.id == message_id)
+            )
+            await session.commit()
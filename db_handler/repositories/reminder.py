@@ -0,0 +1,83 @@
+"""
+Репозиторий для работы с отправленными напоминаниями.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import select, insert, delete
+
+from db_handler.models import ReminderMessage
+from .base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = 10000
+
+
+class ReminderRepository(BaseRepository[ReminderMessage]):
+    """Репозиторий для работы с отправленными напоминаниями о ДР."""
+
+    model = ReminderMessage
+
+    async def add_many(self, reminders: list[dict]) -> None:
+        """
+        Сохранить отправленные напоминания одним INSERT.
+
+        Args:
+            reminders: [{"chat_id", "message_id", "birthday_user_id",
+                "sent_at", "expires_on"}]
+        """
+        if not reminders:
+            return
+
+        async with self._session() as session:
+            await session.execute(insert(ReminderMessage), reminders)
+            await self._commit(session)
+            logger.info(f"✅ Saved {len(reminders)} reminder messages")
+
+    async def get_expired(
+        self, today: date
+    ) -> dict[int, list[tuple[int, int, datetime]]]:
+        """
+        Получить истёкшие напоминания, сгруппированные по чатам.
+
+        Returns:
+            {chat_id: [(ID записи, message_id, sent_at), ...]}
+        """
+        async with self._session() as session:
+            result = await session.execute(
+                select(
+                    ReminderMessage.id,
+                    ReminderMessage.chat_id,
+                    ReminderMessage.message_id,
+                    ReminderMessage.sent_at,
+                )
+                .where(ReminderMessage.expires_on <= today)
+                .order_by(ReminderMessage.chat_id, ReminderMessage.message_id)
+            )
+
+            messages: dict[int, list[tuple[int, int, datetime]]] = defaultdict(list)
+            for record_id, chat_id, message_id, sent_at in result.all():
+                messages[chat_id].append((record_id, message_id, sent_at))
+            return dict(messages)
+
+    async def delete_many(self, record_ids: list[int]) -> None:
+        """Удалить записи обработанных напоминаний (по DELETE_CHUNK_SIZE за запрос)."""
+        if not record_ids:
+            return
+
+        async with self._session() as session:
+            deleted = 0
+            for start in range(0, len(record_ids), DELETE_CHUNK_SIZE):
+                result = await session.execute(
+                    delete(ReminderMessage).where(
+                        ReminderMessage.id.in_(
+                            record_ids[start : start + DELETE_CHUNK_SIZE]
+                        )
+                    )
+                )
+                deleted += result.rowcount
+            await self._commit(session)
+            logger.info(f"✅ Deleted {deleted} reminder records")
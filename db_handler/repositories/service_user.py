@@ -6,6 +6,7 @@ import logging
 from sqlalchemy import select
 
 from db_handler.models import ServiceUser, User
+from db_handler.cache import user_cache
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
@@ -20,23 +21,28 @@ class ServiceUserRepository(BaseRepository[ServiceUser]):
         """Установить сервисного пользователя."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(select(ServiceUser))
             service_user = result.scalars().first()
 
+            previous_user_id = None
             if service_user:
+                previous_user_id = service_user.user_id
                 service_user.user_id = user_id
             else:
                 service_user = ServiceUser(user_id=user_id)
                 session.add(service_user)
 
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
+            if previous_user_id is not None:
+                self._on_commit(user_cache.invalidate, previous_user_id)
             logger.info(f"✅ Установлен сервисный пользователь: {user_id}")
             return service_user
 
     async def get(self) -> ServiceUser:
         """Получить сервисного пользователя."""
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(select(ServiceUser))
             return result.scalar_one()
 
@@ -47,7 +53,7 @@ class ServiceUserRepository(BaseRepository[ServiceUser]):
         Если пользователя с указанным user_id еще нет в таблице users,
         инициализация пропускается с предупреждением.
         """
-        async with self._session_factory() as session:
+        async with self._session() as session:
             # Проверяем, существует ли service_user
             result = await session.execute(select(ServiceUser))
             existing = result.scalars().first()
@@ -68,6 +74,7 @@ class ServiceUserRepository(BaseRepository[ServiceUser]):
 
             # Создаем service_user только если пользователь существует
             session.add(ServiceUser(user_id=user_id))
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
             logger.info(f"✅ Инициализирован сервисный пользователь: {user_id}")
 
@@ -5,7 +5,7 @@
 import logging
 from datetime import datetime
 
-from sqlalchemy import select, delete, or_, and_, extract
+from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
 
 from db_handler.models import Transfer, User, Greeting
@@ -47,7 +47,7 @@ class TransferRepository(BaseRepository[Transfer]):
         birthday_user_id = int(birthday_user_id)
         amount = float(amount)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             # Проверяем существование пользователей
             sender = await session.get(User, sender_id)
             if not sender:
@@ -67,7 +67,7 @@ class TransferRepository(BaseRepository[Transfer]):
                 gift_url=gift_url,
             )
             session.add(transfer)
-            await session.commit()
+            await self._commit(session)
             await session.refresh(transfer)
 
             logger.info(
@@ -79,7 +79,7 @@ class TransferRepository(BaseRepository[Transfer]):
         """Получить все переводы для именинника."""
         birthday_user_id = int(birthday_user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(Transfer)
                 .where(Transfer.birthday_user_id == birthday_user_id)
@@ -89,7 +89,7 @@ class TransferRepository(BaseRepository[Transfer]):
 
     async def get_all(self) -> list[Transfer]:
         """Получить все переводы с данными отправителей и именинников."""
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(Transfer)
                 .options(
@@ -104,24 +104,16 @@ class TransferRepository(BaseRepository[Transfer]):
         """Очистка записей переводов для пользователей с прошедшими ДР."""
         current = datetime.now()
 
-        async with self._session_factory() as session:
-            # Находим пользователей с прошедшими ДР
-            result = await session.execute(
-                select(User).where(
-                    or_(
-                        extract("month", User.birth_date) < current.month,
-                        and_(
-                            extract("month", User.birth_date) == current.month,
-                            extract("day", User.birth_date) < current.day,
-                        ),
-                    )
+        async with self._session() as session:
+            # Находим пользователей с прошедшими ДР (диапазон по индексу birth_mmdd)
+            result = await session.scalars(
+                select(User.user_id).where(
+                    User.birth_mmdd < current.month * 100 + current.day
                 )
             )
-            past_birthday_users = result.scalars().all()
-
-            if past_birthday_users:
-                user_ids = [user.user_id for user in past_birthday_users]
+            user_ids = list(result.all())
 
+            if user_ids:
                 # Удаляем переводы
                 await session.execute(
                     delete(Transfer).where(Transfer.birthday_user_id.in_(user_ids))
@@ -132,6 +124,6 @@ class TransferRepository(BaseRepository[Transfer]):
                     delete(Greeting).where(Greeting.birthday_user_id.in_(user_ids))
                 )
 
-                await session.commit()
+                await self._commit(session)
                 logger.info(f"✅ Cleared birthday records for {len(user_ids)} users")
 
@@ -2,18 +2,30 @@
 Репозиторий для работы с пользователями.
 """
 
+import calendar
 import logging
-from datetime import date
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import selectinload, joinedload, lazyload
 
-from db_handler.models import User
+from db_handler.models import User, Administrator, Collector
+from db_handler.cache import user_cache, active_collector_cache, unregistered_cache
 from exceptions import RecordNotFound, RecordAlreadyExists
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
 
+# Сколько user_id читается из курсора за раз
+ID_CHUNK_SIZE = 1000
+
+
+def _mmdd(day: date) -> int:
+    """Месяц и день даты в формате User.birth_mmdd."""
+    return day.month * 100 + day.day
+
 
 class UserRepository(BaseRepository[User]):
     """Репозиторий для работы с пользователями."""
@@ -32,7 +44,7 @@ class UserRepository(BaseRepository[User]):
         """Добавить нового пользователя."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             existing = await session.get(User, user_id)
             if existing:
                 raise RecordAlreadyExists(entity=User.__name__, entity_id=user_id)
@@ -46,7 +58,9 @@ class UserRepository(BaseRepository[User]):
                 birth_date=birth_date,
             )
             session.add(user)
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
+            self._on_commit(unregistered_cache.invalidate, user_id)
             logger.info(f"✅ User {user_id} added to database")
             return user
 
@@ -62,7 +76,7 @@ class UserRepository(BaseRepository[User]):
         """Обновить данные пользователя."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             user = await session.get(User, user_id)
             if not user:
                 raise RecordNotFound(entity=User.__name__, entity_id=user_id)
@@ -77,7 +91,10 @@ class UserRepository(BaseRepository[User]):
             if birth_date:
                 user.birth_date = birth_date
 
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
+            # ФИО активного коллектора показывается в реквизитах
+            self._on_commit(active_collector_cache.invalidate)
             logger.info(f"✅ User {user_id} updated in database")
             return user
 
@@ -85,20 +102,23 @@ class UserRepository(BaseRepository[User]):
         """Удалить пользователя."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             user = await session.get(User, user_id)
             if not user:
                 raise RecordNotFound(entity=User.__name__, entity_id=user_id)
 
             await session.delete(user)
-            await session.commit()
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
+            # Вместе с пользователем каскадно удаляется его запись коллектора
+            self._on_commit(active_collector_cache.invalidate)
             logger.info(f"✅ User {user_id} deleted from database")
 
     async def get(self, user_id: int) -> User:
         """Получить пользователя по ID с загрузкой связей."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             query = select(User).where(User.user_id == user_id)
             query = query.options(
                 selectinload(User.administrator),
@@ -113,19 +133,211 @@ class UserRepository(BaseRepository[User]):
                 raise RecordNotFound(entity=User.__name__, entity_id=user_id)
             return user
 
-    async def get_all(self, with_transfers: bool = False) -> list[User]:
+    async def get_with_roles(self, user_id: int) -> User:
+        """
+        Получить пользователя с ролями за один запрос.
+
+        administrator, collector и service_user загружаются через LEFT JOIN
+        в том же SELECT. Переводы не загружаются (lazyload).
+        Пользователь и роли возвращаются отсоединёнными от сессии:
+        middleware кладёт их в user_cache.
+        Используется в middleware на каждом апдейте.
+        """
+        user_id = int(user_id)
+
+        async with self._session() as session:
+            query = (
+                select(User)
+                .where(User.user_id == user_id)
+                .options(
+                    joinedload(User.administrator),
+                    joinedload(User.collector),
+                    joinedload(User.service_user),
+                    lazyload(User.sent_transfers),
+                    lazyload(User.received_transfers),
+                )
+            )
+
+            result = await session.execute(query)
+            user = result.scalar_one_or_none()
+
+            if not user:
+                raise RecordNotFound(entity=User.__name__, entity_id=user_id)
+            self._detach(
+                session, user, user.administrator, user.collector, user.service_user
+            )
+            return user
+
+    async def get_all(
+        self, with_transfers: bool = False, deliverable_only: bool = False
+    ) -> list[User]:
         """
         Получить всех пользователей.
         
         Args:
             with_transfers: Загружать ли переводы пользователей
+            deliverable_only: Только пользователи, которым доставляются сообщения
         """
-        async with self._session_factory() as session:
+        async with self._session() as session:
             query = select(User)
 
             if with_transfers:
                 query = query.options(selectinload(User.sent_transfers))
+            if deliverable_only:
+                query = query.where(User.delivery_status.is_(None))
 
             result = await session.execute(query)
             return list(result.scalars().all())
 
+    async def get_by_birthday(
+        self, month: int, day: int, year: int | None = None
+    ) -> list[User]:
+        """
+        Получить пользователей, у которых день рождения month.day.
+
+        Фильтрация выполняется в БД по индексу birth_mmdd, переводы
+        не загружаются.
+
+        Args:
+            year: Год, в котором отмечается день рождения. В невисокосный
+                год родившиеся 29 февраля отмечают 28 февраля.
+        """
+        days = [month * 100 + day]
+        if (month, day) == (2, 28) and year is not None and not calendar.isleap(year):
+            days.append(229)
+
+        return await self._get_by_birth_mmdd(User.birth_mmdd.in_(days))
+
+    async def get_birthdays(
+        self, start: date | None = None, end: date | None = None
+    ) -> list[User]:
+        """
+        Получить пользователей с днём рождения (месяц и день) в диапазоне
+        [start, end) в порядке календаря. Год в start и end не учитывается.
+
+        Пользователи без даты рождения не возвращаются.
+        """
+        condition = User.birth_mmdd.is_not(None)
+        if start is not None:
+            condition &= User.birth_mmdd >= _mmdd(start)
+        if end is not None:
+            condition &= User.birth_mmdd < _mmdd(end)
+
+        return await self._get_by_birth_mmdd(condition)
+
+    async def _get_by_birth_mmdd(self, condition) -> list[User]:
+        async with self._session() as session:
+            result = await session.execute(
+                select(User)
+                .where(condition)
+                .order_by(User.birth_mmdd, User.last_name)
+                .options(
+                    lazyload(User.sent_transfers),
+                    lazyload(User.received_transfers),
+                )
+            )
+            return list(result.scalars().all())
+
+    async def iter_ids(
+        self, chunk_size: int = ID_CHUNK_SIZE, deliverable_only: bool = True
+    ) -> AsyncIterator[list[int]]:
+        """
+        Перебрать ID пользователей пачками по chunk_size.
+
+        ID читаются из серверного курсора (stream + yield_per), поэтому
+        в памяти находится не больше одной пачки, сколько бы ни было
+        пользователей. Курсор открыт в отдельной сессии, пока идёт
+        перебор, — запросы в теле цикла выполняются в других сессиях.
+
+        Args:
+            chunk_size: Размер пачки
+            deliverable_only: Только пользователи, которым доставляются сообщения
+        """
+        query = select(User.user_id).order_by(User.user_id)
+        if deliverable_only:
+            query = query.where(User.delivery_status.is_(None))
+
+        async with self._session_factory() as session:
+            result = await session.stream_scalars(
+                query.execution_options(yield_per=chunk_size)
+            )
+            async for chunk in result.partitions():
+                yield list(chunk)
+
+    async def get_admin_ids(self) -> list[int]:
+        """ID администраторов, которым доставляются сообщения."""
+        return await self._get_ids(
+            select(User.user_id).join(
+                Administrator, Administrator.user_id == User.user_id
+            )
+        )
+
+    async def get_collector_ids(self) -> list[int]:
+        """ID коллекторов, которым доставляются сообщения."""
+        return await self._get_ids(
+            select(User.user_id).join(Collector, Collector.user_id == User.user_id)
+        )
+
+    async def get_ids_by_birth_month(self, month: int) -> list[int]:
+        """ID пользователей с днём рождения в месяце month (1-12)."""
+        return await self._get_ids(
+            select(User.user_id).where(
+                User.birth_mmdd.between(month * 100 + 1, month * 100 + 31)
+            )
+        )
+
+    async def get_active_ids(self, days: int) -> list[int]:
+        """ID пользователей, писавших боту за последние days дней."""
+        since = datetime.now() - timedelta(days=days)
+        return await self._get_ids(
+            select(User.user_id).where(User.last_seen_at >= since)
+        )
+
+    async def _get_ids(self, query: Select) -> list[int]:
+        """Выполнить SELECT user_id, оставив только доступных для доставки."""
+        async with self._session() as session:
+            result = await session.scalars(query.where(User.delivery_status.is_(None)))
+            return list(result.all())
+
+    async def touch(self, user_id: int) -> None:
+        """
+        Отметить, что пользователь пишет боту: обновить last_seen_at
+        и снять отметку о недоставке сообщений.
+        """
+        user_id = int(user_id)
+
+        async with self._session() as session:
+            await session.execute(
+                update(User)
+                .where(User.user_id == user_id)
+                .values(last_seen_at=datetime.now(), delivery_status=None)
+            )
+            await self._commit(session)
+            self._on_commit(user_cache.invalidate, user_id)
+
+    async def set_delivery_statuses(self, statuses: dict[int, str | None]) -> None:
+        """
+        Отметить, доставляются ли пользователям сообщения (пачкой).
+
+        Args:
+            statuses: {user_id: причина недоставки или None}
+        """
+        if not statuses:
+            return
+
+        by_status: dict[str | None, list[int]] = defaultdict(list)
+        for user_id, status in statuses.items():
+            by_status[status].append(int(user_id))
+
+        async with self._session() as session:
+            for status, user_ids in by_status.items():
+                await session.execute(
+                    update(User)
+                    .where(User.user_id.in_(user_ids))
+                    .values(delivery_status=status)
+                )
+            await self._commit(session)
+
+        for user_id in statuses:
+            self._on_commit(user_cache.invalidate, int(user_id))
+        logger.info(f"✅ Delivery status updated for {len(statuses)} users")
@@ -26,7 +26,7 @@ class WishRepository(BaseRepository[Wish]):
         """Добавить желание."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             # Проверяем существование пользователя
             user = await session.get(User, user_id)
             if not user:
@@ -34,7 +34,7 @@ class WishRepository(BaseRepository[Wish]):
 
             wish = Wish(user_id=user_id, wish_text=wish_text, wish_url=wish_url)
             session.add(wish)
-            await session.commit()
+            await self._commit(session)
             await session.refresh(wish)
 
             logger.info(f"✅ Wish added for user {user_id}, wish_id: {wish.id}")
@@ -44,7 +44,7 @@ class WishRepository(BaseRepository[Wish]):
         """Получить желание по ID."""
         wish_id = int(wish_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             wish = await session.get(Wish, wish_id)
             if not wish:
                 raise RecordNotFound(entity=Wish.__name__, entity_id=wish_id)
@@ -54,7 +54,7 @@ class WishRepository(BaseRepository[Wish]):
         """Получить все желания пользователя."""
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             result = await session.execute(
                 select(Wish).where(Wish.user_id == user_id).order_by(Wish.id)
             )
@@ -71,7 +71,7 @@ class WishRepository(BaseRepository[Wish]):
         wish_id = int(wish_id)
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             wish = await session.get(Wish, wish_id)
 
             if not wish or wish.user_id != user_id:
@@ -86,7 +86,7 @@ class WishRepository(BaseRepository[Wish]):
             if wish_url is not None:
                 wish.wish_url = wish_url
 
-            await session.commit()
+            await self._commit(session)
             logger.info(f"✅ Wish {wish_id} updated by user {user_id}")
             return wish
 
@@ -95,7 +95,7 @@ class WishRepository(BaseRepository[Wish]):
         wish_id = int(wish_id)
         user_id = int(user_id)
 
-        async with self._session_factory() as session:
+        async with self._session() as session:
             wish = await session.get(Wish, wish_id)
 
             if not wish or wish.user_id != user_id:
@@ -106,6 +106,6 @@ class WishRepository(BaseRepository[Wish]):
                 )
 
             await session.delete(wish)
-            await session.commit()
+            await self._commit(session)
             logger.info(f"✅ Wish {wish_id} deleted by user {user_id}")
 
@@ -2,8 +2,18 @@
 Управление подключением к БД и сессиями.
 """
 
+import asyncio
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    async_sessionmaker,
+    AsyncEngine,
+    AsyncSession,
+)
 from sqlalchemy import text
 
 from .models import Base
@@ -11,6 +21,78 @@ from .models import Base
 logger = logging.getLogger(__name__)
 
 
+class RequestScope:
+    """
+    Unit of work одного апдейта.
+
+    Сессия открывается лениво при первом обращении репозитория к БД
+    и используется всеми репозиториями до конца апдейта, поэтому
+    соединение берётся из пула (и проверяется pool_pre_ping) один раз.
+    Изменения фиксируются одним commit в конце апдейта.
+
+    После первой записи операции репозиториев выполняются в SAVEPOINT:
+    ошибка БД откатывает только упавшую операцию, а не изменения,
+    уже сделанные апдейтом (см. BaseRepository._session).
+
+    Scope привязан к задаче, в которой создан: фоновые задачи,
+    запущенные из хендлера, работают с собственными сессиями.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+        self._after_commit: list[Callable[[], None]] = []
+        self.task = asyncio.current_task()
+        # В транзакции апдейта есть отправленные в БД изменения
+        self.has_writes = False
+
+    def get_session(self) -> AsyncSession:
+        """Сессия апдейта (создаётся при первом вызове)."""
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Выполнить callback после успешного commit."""
+        self._after_commit.append(callback)
+
+    async def commit(self) -> None:
+        # Апдейт мог не обращаться к БД, но поставить действия после commit
+        if self._session is not None:
+            await self._session.commit()
+        for callback in self._after_commit:
+            callback()
+        self._after_commit.clear()
+
+    async def rollback(self) -> None:
+        # Кэши не сбрасываются: в них объекты, отсоединённые от сессий
+        # (BaseRepository._detach), а записи, которые апдейт изменил,
+        # репозитории уже инвалидировали (BaseRepository._on_commit)
+        self._after_commit.clear()
+        if self._session is None:
+            return
+        await self._session.rollback()
+        self.has_writes = False
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_request_scope: ContextVar[RequestScope | None] = ContextVar(
+    "db_request_scope", default=None
+)
+
+
+def get_request_scope() -> RequestScope | None:
+    """Текущий unit of work апдейта или None (планировщик, фоновые задачи)."""
+    scope = _request_scope.get()
+    if scope is None or scope.task is not asyncio.current_task():
+        return None
+    return scope
+
+
 class DatabaseSession:
     """Класс для управления подключением к БД."""
 
@@ -63,3 +145,22 @@ class DatabaseSession:
             raise RuntimeError("Database not connected. Call connect() first.")
         return self.session_factory
 
+    @asynccontextmanager
+    async def request_scope(self) -> AsyncIterator[RequestScope]:
+        """
+        Открыть unit of work для одного апдейта.
+
+        В конце блока изменения фиксируются, при исключении — откатываются.
+        """
+        scope = RequestScope(self.get_session())
+        token = _request_scope.set(scope)
+        try:
+            yield scope
+            await scope.commit()
+        except Exception:
+            await scope.rollback()
+            raise
+        finally:
+            _request_scope.reset(token)
+            await scope.close()
+
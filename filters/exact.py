@@ -0,0 +1,39 @@
+"""
+Фильтры точного совпадения текста сообщения и callback_data.
+
+Используются вместо F.text == ... / F.data == ...: значение фильтра
+доступно как атрибут, и utils.dispatch_index строит по нему индекс
+хендлеров.
+"""
+
+from collections.abc import Hashable
+
+from aiogram.filters import Filter
+from aiogram.types import TelegramObject
+
+
+class FieldEquals(Filter):
+    """Поле field события равно value."""
+
+    field: str
+
+    def __init__(self, value: Hashable) -> None:
+        self.value = value
+
+    async def __call__(self, event: TelegramObject) -> bool:
+        return getattr(event, self.field, None) == self.value
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}({self.value!r})"
+
+
+class TextEquals(FieldEquals):
+    """Текст сообщения равен value (кнопки меню)."""
+
+    field = "text"
+
+
+class DataEquals(FieldEquals):
+    """callback_data равна value."""
+
+    field = "data"
@@ -1,10 +1,10 @@
-from aiogram import Router, F
-from aiogram.filters import Command
+from aiogram import Bot, Router, F
+from aiogram.filters import Command, CommandObject
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 import logging
-import asyncio
 
+from filters.exact import DataEquals, TextEquals
 from db_handler import PostgresHandler
 from keyboards.main_menu_keyboards import BUTTON_ADMIN_PANEL, get_main_menu_keyboard
 from keyboards.admin_keyboards import (
@@ -12,11 +12,22 @@ from keyboards.admin_keyboards import (
     get_confirm_action_keyboard,
     DELETE_USER,
     SET_ACTIVE_COLLECTOR,
+    STOP_BROADCAST,
+    UNPIN_BROADCAST,
+    DELETE_BROADCAST,
 )
 from keyboards.collector_keyboards import get_collector_create_keyboard
 from states.user_states import AdminStates
-from db_handler.models import Collector
+from db_handler.models import BroadcastJob, Collector
 from exceptions import RecordNotFound, StateDataError
+from utils.outbox import Outbox, PRIORITY_HIGH
+from .services.service_broadcast import start_broadcast, stop_broadcast
+from .services.service_segment import (
+    SEGMENT_USAGE,
+    parse_segment,
+    describe_segment,
+    get_segment_ids,
+)
 from .services.service_user_list import get_user_dict_from_state, get_user_id_by_num
 
 admin_router = Router()
@@ -35,7 +46,7 @@ MSG_ERROR_DELETE_USER = "❌ Ошибка при удалении пользов
 # =============== Главное меню админ панели ===============
 
 
-@admin_router.message(F.text == BUTTON_ADMIN_PANEL)
+@admin_router.message(TextEquals(BUTTON_ADMIN_PANEL), flags={"throttling": "heavy"})
 async def show_admin_panel(
     message: Message,
     state: FSMContext,
@@ -79,7 +90,7 @@ async def show_admin_panel(
 # =============== Назначение активного коллектора ===============
 
 
-@admin_router.callback_query(F.data == SET_ACTIVE_COLLECTOR)
+@admin_router.callback_query(DataEquals(SET_ACTIVE_COLLECTOR))
 async def set_active_collector(callback: CallbackQuery, state: FSMContext):
     await callback.message.answer(
         "👤 Для назначения ответственного за сбор введите его номер согласно админ панели"
@@ -125,7 +136,7 @@ async def process_active_collector(
 # =============== Удаление пользователя ===============
 
 
-@admin_router.callback_query(F.data == DELETE_USER)
+@admin_router.callback_query(DataEquals(DELETE_USER))
 async def delete_user_start(callback: CallbackQuery, state: FSMContext):
     await callback.message.answer(
         "👤 Для удаления пользователя введите его номер согласно админ панели"
@@ -175,7 +186,7 @@ async def process_delete_user(message: Message, state: FSMContext, db: PostgresH
 
 @admin_router.callback_query(F.data.regexp(r"^confirm_(\w+):(\d+)$"))
 async def confirm_action_callback(
-    callback: CallbackQuery, state: FSMContext, db: PostgresHandler
+    callback: CallbackQuery, state: FSMContext, db: PostgresHandler, outbox: Outbox
 ):
     import re
 
@@ -213,9 +224,6 @@ async def confirm_action_callback(
                 )
                 # Обновляем меню пользователя, чтобы появилась кнопка панели коллектора
                 try:
-                    # Небольшая задержка, чтобы БД успела обновиться
-                    await asyncio.sleep(0.1)
-
                     updated_user = await db.get_user(target_id)
                     is_collector = updated_user.is_collector
                     logger.info(
@@ -230,9 +238,10 @@ async def confirm_action_callback(
                             f"collector={updated_user.collector}"
                         )
 
-                    await callback.bot.send_message(
+                    await outbox.send(
                         target_id,
                         "🔔 Ваше меню обновлено! Теперь доступна 💰Сбор панель",
+                        priority=PRIORITY_HIGH,
                         reply_markup=await get_main_menu_keyboard(
                             is_admin=updated_user.is_admin,
                             is_collector=is_collector,
@@ -243,10 +252,11 @@ async def confirm_action_callback(
                         f"Не удалось обновить меню пользователя {target_id}: {e}"
                     )
             except RecordNotFound:
-                await callback.bot.send_message(
+                await outbox.send(
                     target_id,
                     "🔧 Администратор назначил Вас ответственным за сбор средств 💰 на подарки 🎁\n\n"
                     "Пожалуйста, укажите реквизиты для переводов:",
+                    priority=PRIORITY_HIGH,
                     reply_markup=get_collector_create_keyboard(),
                 )
                 await callback.message.edit_text(
@@ -264,7 +274,7 @@ async def confirm_action_callback(
     await state.clear()
 
 
-@admin_router.callback_query(F.data == "cancel")
+@admin_router.callback_query(DataEquals("cancel"))
 async def cancel_action_callback(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_text("❌ Действие отменено.")
     await state.clear()
@@ -274,94 +284,64 @@ async def cancel_action_callback(callback: CallbackQuery, state: FSMContext):
 
 
 @admin_router.message(Command("pin_message"))
-async def pin_message_start(message: Message, state: FSMContext):
-    """Начало процесса закрепления сообщения"""
+async def pin_message_start(
+    message: Message, command: CommandObject, state: FSMContext
+):
+    """
+    Начало процесса закрепления сообщения.
+
+    /pin_message [сегмент] — получатели рассылки (см. service_segment).
+    """
+    try:
+        segment, value = parse_segment(command.args)
+    except ValueError:
+        await message.answer(SEGMENT_USAGE)
+        return
+
     await message.answer(
-        "📌 Введите сообщение, которое нужно закрепить и разослать всем пользователям:"
+        "📌 Введите сообщение, которое нужно закрепить и разослать "
+        f"{describe_segment(segment, value)}:"
     )
     await state.set_state(AdminStates.waiting_for_pin_message)
+    await state.update_data(segment=segment, segment_value=value)
 
 
 @admin_router.message(AdminStates.waiting_for_pin_message)
 async def process_pin_message(
     message: Message, state: FSMContext, db: PostgresHandler
 ):
-    """Обработка сообщения для закрепления и рассылки"""
+    """Обработка сообщения для закрепления и запуск рассылки в фоне"""
     try:
-        bot = message.bot
         # Получаем текст сообщения
         message_text = message.text or message.caption or ""
         if not message_text and not message.photo and not message.document:
             await message.answer("❌ Сообщение не может быть пустым.")
             return
 
-        # Получаем всех зарегистрированных пользователей
-        users = await db.get_all_users()
-        if not users:
-            await message.answer("❌ Нет зарегистрированных пользователей.")
-            await state.clear()
-            return
-
-        # Рассылаем сообщение всем пользователям
-        success_count = 0
-        failed_count = 0
-        pinned_count = 0
-
-        for user in users:
-            try:
-                # Отправляем сообщение
-                if message.photo:
-                    sent_msg = await bot.send_photo(
-                        chat_id=user.user_id,
-                        photo=message.photo[-1].file_id,
-                        caption=message_text if message_text else None,
-                    )
-                elif message.document:
-                    sent_msg = await bot.send_document(
-                        chat_id=user.user_id,
-                        document=message.document.file_id,
-                        caption=message_text if message_text else None,
-                    )
-                else:
-                    sent_msg = await bot.send_message(
-                        chat_id=user.user_id, text=message_text
-                    )
-
-                # Пытаемся закрепить сообщение (работает только в группах/каналах)
-                # В личных чатах закрепление невозможно через Bot API
-                try:
-                    await bot.pin_chat_message(
-                        chat_id=user.user_id, message_id=sent_msg.message_id
-                    )
-                    pinned_count += 1
-                except Exception:
-                    # Игнорируем ошибки закрепления (например, в личных чатах)
-                    pass
-
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                error_msg = str(e).lower()
-                if "blocked" in error_msg or "chat not found" in error_msg:
-                    logger.warning(
-                        f"Пользователь {user.user_id} заблокировал бота или чат не найден"
-                    )
-                elif "forbidden" in error_msg:
-                    logger.warning(f"Нет доступа к пользователю {user.user_id}")
-                else:
-                    logger.exception(
-                        f"Ошибка отправки сообщения пользователю {user.user_id}: {e}"
-                    )
+        # Получатели сегмента выбираются одним запросом (только user_id)
+        state_data = await state.get_data()
+        user_ids = await get_segment_ids(
+            db, state_data.get("segment", ""), state_data.get("segment_value")
+        )
 
-        # Отправляем отчет админу
-        report = (
-            f"✅ Сообщение разослано:\n"
-            f"📤 Успешно отправлено: {success_count}\n"
-            f"❌ Ошибок: {failed_count}\n"
-            f"📌 Закреплено: {pinned_count}"
+        # Рассылка с получателями сохраняется в БД
+        # и продолжится после перезапуска бота
+        job = await db.broadcasts.create_job(
+            kind=BroadcastJob.KIND_PIN,
+            admin_id=message.from_user.id,
+            text=message_text or None,
+            photo_file_id=message.photo[-1].file_id if message.photo else None,
+            document_file_id=message.document.file_id if message.document else None,
+            user_ids=user_ids,
         )
-        await message.answer(report)
         await state.clear()
+        if not job.total:
+            await db.broadcasts.finish(job.id)
+            await message.answer("❌ Нет пользователей для рассылки.")
+            return
+
+        # Прогресс и итоговый отчёт придут отдельным сообщением
+        start_broadcast(message.bot, db, job)
 
     except Exception as e:
         logger.exception(f"Ошибка при рассылке сообщения: {e}")
@@ -369,44 +349,119 @@ async def process_pin_message(
         await state.clear()
 
 
-@admin_router.message(Command("unpin"))
-async def unpin_message(message: Message, db: PostgresHandler):
-    """Открепить все закрепленные сообщения у всех пользователей"""
-    try:
-        bot = message.bot
-        users = await db.get_all_users()
-        if not users:
-            await message.answer("❌ Нет зарегистрированных пользователей.")
-            return
+async def _start_messages_job(
+    bot: Bot, db: PostgresHandler, admin_id: int, kind: str, source_job_id: int | None
+) -> str | None:
+    """
+    Запустить открепление/удаление сообщений рассылки в фоне.
+
+    Returns:
+        Текст для админа, если обрабатывать нечего
+    """
+    if source_job_id is not None:
+        try:
+            source_job = await db.broadcasts.get(source_job_id)
+        except RecordNotFound:
+            return f"❌ Рассылка {source_job_id} не найдена."
+        # Открепить и удалить можно только сообщения рассылки с закреплением
+        if source_job.kind != BroadcastJob.KIND_PIN:
+            return f"❌ Рассылка {source_job_id} — открепление/удаление, а не сообщение."
 
-        success_count = 0
-        failed_count = 0
+    job = await db.broadcasts.create_job(
+        kind=kind, admin_id=admin_id, source_job_id=source_job_id
+    )
+    if not job.total:
+        await db.broadcasts.finish(job.id)
+        if kind == BroadcastJob.KIND_DELETE:
+            return "❌ У этой рассылки нет отправленных сообщений."
+        return "❌ Нет закреплённых сообщений рассылок."
 
-        for user in users:
-            try:
-                await bot.unpin_all_chat_messages(chat_id=user.user_id)
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                error_msg = str(e).lower()
-                if "blocked" in error_msg or "chat not found" in error_msg:
-                    logger.warning(
-                        f"Пользователь {user.user_id} заблокировал бота или чат не найден"
-                    )
-                elif "forbidden" in error_msg:
-                    logger.warning(f"Нет доступа к пользователю {user.user_id}")
-                else:
-                    logger.exception(
-                        f"Ошибка открепления сообщений у пользователя {user.user_id}: {e}"
-                    )
+    start_broadcast(bot, db, job)
+    return None
+
+
+@admin_router.message(Command("unpin"))
+async def unpin_message(message: Message, command: CommandObject, db: PostgresHandler):
+    """
+    Открепить сообщения рассылок (в фоне).
 
-        report = (
-            f"✅ Сообщения откреплены:\n"
-            f"📌 Успешно откреплено: {success_count}\n"
-            f"❌ Ошибок: {failed_count}"
+    /unpin — во всех чатах, где закреплено сообщение рассылки;
+    /unpin <id> — только сообщения рассылки <id>.
+    """
+    try:
+        source_job_id = int(command.args) if command.args else None
+    except ValueError:
+        await message.answer("❌ Использование: /unpin [номер рассылки]")
+        return
+
+    try:
+        error = await _start_messages_job(
+            message.bot,
+            db,
+            message.from_user.id,
+            BroadcastJob.KIND_UNPIN,
+            source_job_id,
         )
-        await message.answer(report)
+        if error:
+            await message.answer(error)
 
     except Exception as e:
         logger.exception(f"Ошибка при откреплении сообщений: {e}")
         await message.answer("❌ Произошла ошибка при откреплении сообщений.")
+
+
+@admin_router.message(Command("delete_broadcast"))
+async def delete_broadcast_message(
+    message: Message, command: CommandObject, db: PostgresHandler
+):
+    """Удалить сообщения рассылки у всех получателей (в фоне)"""
+    if not command.args or not command.args.strip().isdigit():
+        await message.answer("❌ Использование: /delete_broadcast <номер рассылки>")
+        return
+
+    try:
+        error = await _start_messages_job(
+            message.bot,
+            db,
+            message.from_user.id,
+            BroadcastJob.KIND_DELETE,
+            int(command.args),
+        )
+        if error:
+            await message.answer(error)
+
+    except Exception as e:
+        logger.exception(f"Ошибка при удалении сообщений рассылки: {e}")
+        await message.answer("❌ Произошла ошибка при удалении сообщений.")
+
+
+@admin_router.callback_query(F.data.startswith(UNPIN_BROADCAST))
+@admin_router.callback_query(F.data.startswith(DELETE_BROADCAST))
+async def broadcast_action_callback(callback: CallbackQuery, db: PostgresHandler):
+    """Открепление/удаление сообщений рассылки кнопкой из отчёта"""
+    if callback.data.startswith(UNPIN_BROADCAST):
+        kind = BroadcastJob.KIND_UNPIN
+        source_job_id = int(callback.data.removeprefix(UNPIN_BROADCAST))
+    else:
+        kind = BroadcastJob.KIND_DELETE
+        source_job_id = int(callback.data.removeprefix(DELETE_BROADCAST))
+
+    try:
+        error = await _start_messages_job(
+            callback.bot, db, callback.from_user.id, kind, source_job_id
+        )
+        await callback.answer(error or "⏳ Запущено", show_alert=bool(error))
+
+    except Exception as e:
+        logger.exception(f"Ошибка при обработке сообщений рассылки: {e}")
+        await callback.answer("❌ Произошла ошибка", show_alert=True)
+
+
+@admin_router.callback_query(F.data.startswith(STOP_BROADCAST))
+async def stop_broadcast_callback(callback: CallbackQuery):
+    """Остановка выполняющейся рассылки"""
+    job_id = int(callback.data.removeprefix(STOP_BROADCAST))
+    if stop_broadcast(job_id):
+        await callback.answer("⏹ Рассылка останавливается...")
+    else:
+        await callback.answer("Рассылка уже завершена", show_alert=True)
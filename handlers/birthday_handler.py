@@ -4,6 +4,7 @@ from aiogram.fsm.context import FSMContext
 from datetime import datetime
 import logging
 
+from filters.exact import DataEquals, TextEquals
 from db_handler import PostgresHandler
 from exceptions import RecordNotFound, StateDataError
 from keyboards.birthday_keyboards import (
@@ -13,7 +14,6 @@ from keyboards.birthday_keyboards import (
 )
 from keyboards.wishlist_keyboards import get_url_keyboard
 from keyboards.main_menu_keyboards import BUTTON_BIRTHDAYS
-from db_handler.models import User
 from states.user_states import BirthdayStates, GiftSuggestionStates
 from handlers.services.service_user_list import (
     get_user_dict_from_state,
@@ -39,6 +39,44 @@ MONTH_NAMES = {
 }
 
 
+async def begin_gift_suggestion(
+    message: Message,
+    state: FSMContext,
+    db: PostgresHandler,
+    birthday_user_id: int,
+) -> str | None:
+    """
+    Спросить у пользователя текст предложения подарка для именинника.
+
+    Используется кнопкой из уведомления и ссылкой /start gift_<id>
+    из объявления в группе.
+
+    Returns:
+        Текст ошибки или None
+    """
+    # Получаем информацию о пользователе, у которого ДР
+    birthday_user = await db.get_user(birthday_user_id)
+    if not birthday_user.birth_date:
+        return "У пользователя не указана дата рождения"
+
+    # Формируем дату в формате DD.MM
+    date_str = birthday_user.birth_date.strftime("%d.%m")
+    # Получаем полное имя
+    full_name = birthday_user.full_name
+
+    # Формируем текст сообщения
+    message_text = (
+        f"📅 {date_str} день рождения отмечает {full_name}\n\n"
+        "Опишите в одном собщении ваши предложения по подарку:"
+    )
+
+    await state.update_data(birthday_user_id=birthday_user_id)
+    # Отправляем новое сообщение, не редактируя старое (кнопка остается)
+    await message.answer(message_text)
+    await state.set_state(GiftSuggestionStates.waiting_for_gift_text)
+    return None
+
+
 @birthday_router.callback_query(F.data.startswith("suggest_gift:"))
 async def start_suggest_gift(
     callback: CallbackQuery,
@@ -52,28 +90,13 @@ async def start_suggest_gift(
         await callback.answer("Некорректные данные", show_alert=True)
         return
 
-    # Получаем информацию о пользователе, у которого ДР
     try:
-        birthday_user = await db.get_user(birthday_user_id)
-        if not birthday_user.birth_date:
-            await callback.answer("У пользователя не указана дата рождения", show_alert=True)
-            return
-        
-        # Формируем дату в формате DD.MM
-        date_str = birthday_user.birth_date.strftime("%d.%m")
-        # Получаем полное имя
-        full_name = birthday_user.full_name
-        
-        # Формируем текст сообщения
-        message_text = (
-            f"📅 {date_str} день рождения отмечает {full_name}\n\n"
-            "Опишите в одном собщении ваши предложения по подарку:"
+        error = await begin_gift_suggestion(
+            callback.message, state, db, birthday_user_id
         )
-        
-        await state.update_data(birthday_user_id=birthday_user_id)
-        # Отправляем новое сообщение, не редактируя старое (кнопка остается)
-        await callback.message.answer(message_text)
-        await state.set_state(GiftSuggestionStates.waiting_for_gift_text)
+        if error:
+            await callback.answer(error, show_alert=True)
+            return
         await callback.answer()
     except Exception as e:
         logger.exception(f"Ошибка при получении данных пользователя для предложения подарка: {e}")
@@ -100,7 +123,7 @@ async def process_gift_text(message: Message, state: FSMContext):
 
 
 @birthday_router.callback_query(
-    F.data == "url_no", GiftSuggestionStates.waiting_for_gift_url
+    DataEquals("url_no"), GiftSuggestionStates.waiting_for_gift_url
 )
 async def process_gift_url_no(
     callback: CallbackQuery,
@@ -183,37 +206,19 @@ async def process_gift_url(
         await state.clear()
 
 
-@birthday_router.message(F.text == BUTTON_BIRTHDAYS)
+@birthday_router.message(TextEquals(BUTTON_BIRTHDAYS), flags={"throttling": "heavy"})
 async def show_upcoming_birthdays(message: Message, db: PostgresHandler):
     """Показать предстоящие дни рождения."""
-    current_date = datetime.now()
-    current = (current_date.month, current_date.day)
+    today = datetime.now().date()
 
-    users = await db.get_all_users()
+    # Обе выборки — диапазоны по индексу birth_mmdd в порядке календаря
+    upcoming = await db.users.get_birthdays(start=today)
+    past = await db.users.get_birthdays(end=today)
 
-    if not users:
+    if not upcoming and not past:
         await message.answer("Список дней рождений пуст.")
         return
 
-    upcoming: list[User] = []
-    past: list[User] = []
-
-    for user in users:
-        if not user.birth_date:
-            continue  # Пропускаем пользователей без даты рождения
-        if (user.birth_date.month, user.birth_date.day) >= current:
-            upcoming.append(user)
-        else:
-            past.append(user)
-
-    def sort_key(user: User) -> tuple[int, int]:
-        if not user.birth_date:
-            return (13, 32)  # Помещаем пользователей без даты в конец
-        return (user.birth_date.month, user.birth_date.day)
-
-    upcoming.sort(key=sort_key)
-    past.sort(key=sort_key)
-
     response = "🎂 <b>Дни рождения</b>\n\n"
 
     response += "📅 <b>Предстоящие:</b>\n"
@@ -243,7 +248,9 @@ async def show_upcoming_birthdays(message: Message, db: PostgresHandler):
     await message.answer(response, reply_markup=get_birthdays_keyboard())
 
 
-@birthday_router.callback_query(F.data == BIRTHDAYS_WISHLISTS)
+@birthday_router.callback_query(
+    DataEquals(BIRTHDAYS_WISHLISTS), flags={"throttling": "heavy"}
+)
 async def show_users_list_for_wishlist_from_birthdays(
     callback: CallbackQuery,
     state: FSMContext,
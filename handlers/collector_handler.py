@@ -1,9 +1,9 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 import logging
-import asyncio
 
+from filters.exact import DataEquals, TextEquals
 from db_handler import PostgresHandler
 from keyboards.main_menu_keyboards import BUTTON_COLLECTOR_PANEL, get_main_menu_keyboard
 from keyboards.collector_keyboards import (
@@ -19,6 +19,7 @@ from keyboards.collector_keyboards import (
 )
 from db_handler.models import Transfer, User
 from states.user_states import CollectorStates
+from utils.outbox import Outbox
 from handlers.services.service_collector import (
     handle_phone,
     handle_bank,
@@ -29,7 +30,7 @@ collector_router = Router()
 logger = logging.getLogger(__name__)
 
 
-@collector_router.message(F.text == BUTTON_COLLECTOR_PANEL)
+@collector_router.message(TextEquals(BUTTON_COLLECTOR_PANEL))
 async def show_collector_panel(message: Message, user: User):
     """Показ панели коллектора"""
     collector = user.collector
@@ -57,7 +58,7 @@ async def show_collector_panel(message: Message, user: User):
         await message.answer("❌ Произошла ошибка при загрузке панели")
 
 
-@collector_router.callback_query(F.data == UPDATE_COLLECTOR_DATA)
+@collector_router.callback_query(DataEquals(UPDATE_COLLECTOR_DATA))
 async def update_collector_data(callback: CallbackQuery, user: User, state: FSMContext):
     """Показать меню обновления данных коллектора"""
     collector = user.collector
@@ -72,13 +73,15 @@ async def update_collector_data(callback: CallbackQuery, user: User, state: FSMC
     await callback.answer("Выберите что изменить")
 
 
-@collector_router.callback_query(F.data == CREATE_COLLECTOR_DATA)
+@collector_router.callback_query(DataEquals(CREATE_COLLECTOR_DATA))
 async def create_collector_data(callback: CallbackQuery, state: FSMContext):
     """Показать меню обновления данных коллектора"""
     await edit_collector_phone(callback, state)
 
 
-@collector_router.callback_query(F.data == VIEW_ALL_TRANSFERS)
+@collector_router.callback_query(
+    DataEquals(VIEW_ALL_TRANSFERS), flags={"throttling": "heavy"}
+)
 async def view_all_transfers(callback: CallbackQuery, user: User, db: PostgresHandler):
     """Просмотр предложений подарков (только для активного коллектора)."""
     collector = user.collector
@@ -142,7 +145,7 @@ async def view_all_transfers(callback: CallbackQuery, user: User, db: PostgresHa
 # =============== Обработчики редактирования данных коллектора ===============
 
 
-@collector_router.callback_query(F.data == EDIT_COLLECTOR_PHONE)
+@collector_router.callback_query(DataEquals(EDIT_COLLECTOR_PHONE))
 async def edit_collector_phone(callback: CallbackQuery, state: FSMContext):
     """Начать редактирование номера телефона"""
     phone_text = (
@@ -152,7 +155,7 @@ async def edit_collector_phone(callback: CallbackQuery, state: FSMContext):
     await state.set_state(CollectorStates.waiting_for_phone)
 
 
-@collector_router.callback_query(F.data == EDIT_COLLECTOR_BANK)
+@collector_router.callback_query(DataEquals(EDIT_COLLECTOR_BANK))
 async def edit_collector_bank(callback: CallbackQuery, state: FSMContext):
     """Начать редактирование банка"""
     await callback.message.edit_text(
@@ -161,7 +164,7 @@ async def edit_collector_bank(callback: CallbackQuery, state: FSMContext):
     await state.set_state(CollectorStates.waiting_for_bank)
 
 
-@collector_router.callback_query(F.data == SKIP_COLLECTOR_BANK)
+@collector_router.callback_query(DataEquals(SKIP_COLLECTOR_BANK))
 async def skip_collector_bank(callback: CallbackQuery, state: FSMContext):
     """Не указывать банк (установить в None)"""
     await state.update_data(bank_name=None)
@@ -194,11 +197,12 @@ async def process_collector_bank(message: Message, state: FSMContext):
     await handle_collector_confirmation(message, state)
 
 
-@collector_router.callback_query(F.data == "confirm_yes", CollectorStates.confirmation)
+@collector_router.callback_query(DataEquals("confirm_yes"), CollectorStates.confirmation)
 async def confirm_collector_data(
     callback: CallbackQuery,
     state: FSMContext,
     db: PostgresHandler,
+    outbox: Outbox,
 ):
     """Подтверждение данных коллектора - создание или обновление."""
     data = await state.get_data()
@@ -231,27 +235,12 @@ async def confirm_collector_data(
                     f"🏦 <b>Банк:</b> {active_collector.bank_name or 'не указан'}"
                 )
 
+                # Уведомления отправляются из очереди, не задерживая ответ
                 for admin in admins:
-                    try:
-                        await callback.bot.send_message(
-                            admin.user_id,
-                            notification_text,
-                        )
-                        logger.info(
-                            f"✅ Уведомление о новом коллекторе отправлено админу {admin.user_id}"
-                        )
-                    except Exception as e:
-                        error_msg = str(e).lower()
-                        if "blocked" in error_msg or "chat not found" in error_msg:
-                            logger.warning(
-                                f"Админ {admin.user_id} заблокировал бота или чат не найден"
-                            )
-                        else:
-                            logger.exception(
-                                f"Ошибка отправки уведомления админу {admin.user_id}: {e}"
-                            )
+                    if admin.user.is_deliverable:
+                        await outbox.send(admin.user_id, notification_text)
             except Exception as e:
-                logger.exception(f"Ошибка при отправке уведомлений админам: {e}")
+                logger.exception(f"Ошибка при постановке уведомлений админам: {e}")
 
         await callback.message.edit_text(
             "✅ <b>Данные успешно сохранены!</b>\n\n"
@@ -261,9 +250,6 @@ async def confirm_collector_data(
 
         # Обновляем меню пользователя, чтобы появилась кнопка панели коллектора
         try:
-            # Небольшая задержка, чтобы БД успела обновиться
-            await asyncio.sleep(0.1)
-
             updated_user = await db.get_user(user_id)
             is_collector = updated_user.is_collector
             logger.info(
@@ -296,7 +282,7 @@ async def confirm_collector_data(
     await state.clear()
 
 
-@collector_router.callback_query(F.data == "confirm_no", CollectorStates.confirmation)
+@collector_router.callback_query(DataEquals("confirm_no"), CollectorStates.confirmation)
 async def show_collector_edit_menu(callback: CallbackQuery):
     """Показать меню редактирования данных коллектора"""
     await callback.message.edit_reply_markup(reply_markup=get_collector_edit_keyboard())
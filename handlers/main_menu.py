@@ -1,6 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
+from filters.exact import DataEquals, TextEquals
 from db_handler import PostgresHandler
 from handlers.register import show_edit_menu
 from keyboards.wishlist_keyboards import (
@@ -30,7 +31,7 @@ main_menu_router = Router()
 # =============== Обработка кнопок главного меню ===============
 
 
-@main_menu_router.message(F.text == BUTTON_MY_DATA)
+@main_menu_router.message(TextEquals(BUTTON_MY_DATA))
 async def show_user_data(message: Message, state: FSMContext, user: User):
     """Показать данные пользователя"""
     try:
@@ -61,7 +62,7 @@ async def show_user_data(message: Message, state: FSMContext, user: User):
         await state.clear()
 
 
-@main_menu_router.message(F.text == BUTTON_MY_WISHES)
+@main_menu_router.message(TextEquals(BUTTON_MY_WISHES))
 async def show_wishlist(message: Message, state: FSMContext, db: PostgresHandler):
     """Показать wishlist пользователя"""
     try:
@@ -96,14 +97,14 @@ async def show_wishlist(message: Message, state: FSMContext, db: PostgresHandler
         await state.clear()
 
 
-@main_menu_router.callback_query(F.data == "add_wish_from_list")
+@main_menu_router.callback_query(DataEquals("add_wish_from_list"))
 async def add_wish_from_list(callback: CallbackQuery, state: FSMContext):
     """Добавить желание через кнопку из списка вишлиста"""
     await callback.answer()
     await start_add_wish(callback.message, state)
 
 
-@main_menu_router.message(F.text == BUTTON_SERVICE_CHAT)
+@main_menu_router.message(TextEquals(BUTTON_SERVICE_CHAT))
 async def show_support(message: Message, db: PostgresHandler):
     """Показать контакты тех. поддержки"""
     try:
@@ -116,7 +117,7 @@ async def show_support(message: Message, db: PostgresHandler):
         await message.answer("Ошибка получения сервисного чата 😵")
 
 
-@main_menu_router.message(F.text == BUTTON_CANCEL)
+@main_menu_router.message(TextEquals(BUTTON_CANCEL))
 async def cancel(message: Message, state: FSMContext):
     """Отменить ввод чего либо"""
     await state.clear()
@@ -126,7 +127,7 @@ async def cancel(message: Message, state: FSMContext):
 # =============== Обработка кнопок редактирования ===============
 
 
-@main_menu_router.callback_query(F.data == "edit_user_data")
+@main_menu_router.callback_query(DataEquals("edit_user_data"))
 async def process_edit_user_data(callback: CallbackQuery, state: FSMContext):
     """Обработка кнопки редактирования данных пользователя"""
     await callback.answer()  # Убираем индикатор загрузки
@@ -145,7 +146,7 @@ async def process_edit_user_data(callback: CallbackQuery, state: FSMContext):
     await state.update_data(is_edit=True)
 
 
-@main_menu_router.callback_query(F.data == "edit_wishlist")
+@main_menu_router.callback_query(DataEquals("edit_wishlist"))
 async def process_edit_wishlist(callback: CallbackQuery, state: FSMContext):
     """Обработка кнопки редактирования желания"""
     await callback.answer()  # Убираем индикатор загрузки
@@ -185,7 +186,7 @@ async def process_select_wish(
     await callback.message.edit_reply_markup(reply_markup=get_edit_wish_keyboard())
 
 
-@main_menu_router.callback_query(F.data == "edit_wish_text_direct")
+@main_menu_router.callback_query(DataEquals("edit_wish_text_direct"))
 async def process_edit_wish_text_direct(
     callback: CallbackQuery, state: FSMContext, db: PostgresHandler
 ):
@@ -210,7 +211,7 @@ async def process_edit_wish_text_direct(
     await state.set_state(WishStates.waiting_for_wish_text)
 
 
-@main_menu_router.callback_query(F.data == "edit_wish_url_direct")
+@main_menu_router.callback_query(DataEquals("edit_wish_url_direct"))
 async def process_edit_wish_url_direct(
     callback: CallbackQuery, state: FSMContext, db: PostgresHandler
 ):
@@ -237,7 +238,7 @@ async def process_edit_wish_url_direct(
     await state.set_state(WishStates.waiting_for_wish_url)
 
 
-@main_menu_router.callback_query(F.data == "delete_wish")
+@main_menu_router.callback_query(DataEquals("delete_wish"))
 async def process_delete_wish(
     callback: CallbackQuery, state: FSMContext, db: PostgresHandler
 ):
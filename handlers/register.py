@@ -1,11 +1,12 @@
 import logging
 
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from config import get_settings
 from states.user_states import UserDataStates
+from filters.exact import DataEquals
 from db_handler import PostgresHandler
 from keyboards.register_keyboards import (
     get_userdata_edit_keyboard,
@@ -28,7 +29,7 @@ settings = get_settings()
 
 # ========== Обработчики регистрации ==========
 
-@register_router.callback_query(F.data == "register")
+@register_router.callback_query(DataEquals("register"))
 async def start_registration(callback: CallbackQuery, state: FSMContext):
     """Начало регистрации"""
     await callback.message.edit_text(
@@ -91,7 +92,7 @@ async def process_birth_date(message: Message, state: FSMContext):
 
 # ========== Обработчики подтверждения данных ==========
 
-@register_router.callback_query(F.data == "confirm_yes", UserDataStates.confirmation)
+@register_router.callback_query(DataEquals("confirm_yes"), UserDataStates.confirmation)
 async def confirm_data(callback: CallbackQuery, state: FSMContext, db: PostgresHandler):
     """Подтверждение данных"""
     data = await state.get_data()
@@ -184,7 +185,7 @@ async def confirm_data(callback: CallbackQuery, state: FSMContext, db: PostgresH
 
 # ========== Редактирование данных ==========
 
-@register_router.callback_query(F.data == "confirm_no", UserDataStates.confirmation)
+@register_router.callback_query(DataEquals("confirm_no"), UserDataStates.confirmation)
 async def show_edit_menu(callback: CallbackQuery, state: FSMContext):
     """Показать меню редактирования"""
     await callback.answer()  # Убираем индикатор загрузки
@@ -192,7 +193,7 @@ async def show_edit_menu(callback: CallbackQuery, state: FSMContext):
     await state.update_data(is_edit=True)
 
 
-@register_router.callback_query(F.data == "edit_last_name", UserDataStates.confirmation)
+@register_router.callback_query(DataEquals("edit_last_name"), UserDataStates.confirmation)
 async def edit_last_name(callback: CallbackQuery, state: FSMContext):
     await callback.answer()  # Убираем индикатор загрузки
     await callback.message.edit_reply_markup()
@@ -200,7 +201,7 @@ async def edit_last_name(callback: CallbackQuery, state: FSMContext):
     await state.set_state(UserDataStates.waiting_for_last_name)
 
 
-@register_router.callback_query(F.data == "edit_first_name", UserDataStates.confirmation)
+@register_router.callback_query(DataEquals("edit_first_name"), UserDataStates.confirmation)
 async def edit_first_name(callback: CallbackQuery, state: FSMContext):
     await callback.answer()  # Убираем индикатор загрузки
     await callback.message.edit_reply_markup()
@@ -208,7 +209,7 @@ async def edit_first_name(callback: CallbackQuery, state: FSMContext):
     await state.set_state(UserDataStates.waiting_for_first_name)
 
 
-@register_router.callback_query(F.data == "edit_patronymic", UserDataStates.confirmation)
+@register_router.callback_query(DataEquals("edit_patronymic"), UserDataStates.confirmation)
 async def edit_patronymic(callback: CallbackQuery, state: FSMContext):
     await callback.answer()  # Убираем индикатор загрузки
     await callback.message.edit_reply_markup()
@@ -216,7 +217,7 @@ async def edit_patronymic(callback: CallbackQuery, state: FSMContext):
     await state.set_state(UserDataStates.waiting_for_patronymic)
 
 
-@register_router.callback_query(F.data == "edit_birth_date", UserDataStates.confirmation)
+@register_router.callback_query(DataEquals("edit_birth_date"), UserDataStates.confirmation)
 async def edit_birth_date(callback: CallbackQuery, state: FSMContext):
     await callback.answer()  # Убираем индикатор загрузки
     await callback.message.edit_reply_markup()
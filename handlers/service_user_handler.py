@@ -4,6 +4,7 @@ from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 import logging
 
+from filters.exact import DataEquals
 from db_handler import PostgresHandler
 from keyboards.admin_keyboards import get_confirm_action_keyboard
 from states.user_states import ServiceStates
@@ -115,7 +116,7 @@ async def confirm_action_callback(
     await state.clear()
 
 
-@service_user_router.callback_query(F.data == "cancel")
+@service_user_router.callback_query(DataEquals("cancel"))
 async def cancel_action_callback(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_text("❌ Действие отменено.")
     await state.clear()
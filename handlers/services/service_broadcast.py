@@ -0,0 +1,408 @@
+"""
+Выполнение рассылок администратора с сохранением прогресса в БД.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.methods import (
+    DeleteMessage,
+    PinChatMessage,
+    SendDocument,
+    SendMessage,
+    SendPhoto,
+    UnpinAllChatMessages,
+    UnpinChatMessage,
+)
+from aiogram.types import Message
+
+from db_handler import PostgresHandler
+from db_handler.models import BroadcastJob, BroadcastDelivery
+from keyboards.admin_keyboards import (
+    get_broadcast_actions_keyboard,
+    get_broadcast_stop_keyboard,
+)
+from utils.broadcast import Broadcaster, BroadcastStats, run_in_background
+from utils.delivery import undeliverable_reason
+
+logger = logging.getLogger(__name__)
+
+# Статусы доставки записываются в БД пачками
+DELIVERY_BATCH_SIZE = 100
+DELIVERY_FLUSH_INTERVAL = 2.0  # секунд
+
+# Как часто обновляется сообщение с прогрессом
+PROGRESS_INTERVAL = 2.0  # секунд
+
+# Выполняющиеся рассылки: id рассылки → задача
+_running: dict[int, asyncio.Task] = {}
+# Рассылки, остановленные админом. Остальные отмены (остановка бота)
+# оставляют рассылку в статусе running — она продолжится после запуска
+_stop_requested: set[int] = set()
+
+
+class DeliveryRecorder:
+    """
+    Буфер результатов доставки.
+
+    Результаты копятся в памяти и записываются пачкой, когда набирается
+    DELIVERY_BATCH_SIZE записей или проходит DELIVERY_FLUSH_INTERVAL
+    секунд. При аварийной остановке теряются только результаты из
+    буфера — этим получателям сообщение уйдёт повторно.
+    """
+
+    def __init__(self, db: PostgresHandler, job: BroadcastJob) -> None:
+        self.db = db
+        self.job = job
+        self._buffer: list[dict] = []
+        self._released: list[int] = []
+        self._undeliverable: dict[int, str] = {}
+        self._flushed_at = time.monotonic()
+
+    async def record(
+        self,
+        user_id: int,
+        status: str,
+        message_id: int | None = None,
+        is_pinned: bool = False,
+        undeliverable: str | None = None,
+    ) -> None:
+        """
+        Записать результат доставки.
+
+        message_id — отправленное (или обработанное) сообщение.
+        undeliverable — причина, по которой чат недоступен (см.
+        utils.delivery.undeliverable_reason): такой пользователь
+        исключается из следующих рассылок.
+        """
+        self._buffer.append(
+            {
+                "user_id": user_id,
+                "status": status,
+                "message_id": message_id,
+                "is_pinned": is_pinned,
+            }
+        )
+        if status == BroadcastDelivery.STATUS_SENT and self.job.kind in (
+            BroadcastJob.KIND_UNPIN,
+            BroadcastJob.KIND_DELETE,
+        ):
+            self._released.append(user_id)
+        if undeliverable is not None:
+            self._undeliverable[user_id] = undeliverable
+        if (
+            len(self._buffer) >= DELIVERY_BATCH_SIZE
+            or time.monotonic() - self._flushed_at >= DELIVERY_FLUSH_INTERVAL
+        ):
+            await self.flush()
+
+    async def flush(self) -> None:
+        # Забираем буферы до await, чтобы остальные воркеры писали в новые
+        batch, self._buffer = self._buffer, []
+        released, self._released = self._released, []
+        undeliverable, self._undeliverable = self._undeliverable, {}
+        self._flushed_at = time.monotonic()
+
+        await self.db.broadcasts.save_deliveries(self.job.id, batch)
+        await self.db.broadcasts.release_messages(
+            self.job.source_job_id,
+            released,
+            deleted=self.job.kind == BroadcastJob.KIND_DELETE,
+        )
+        await self.db.set_delivery_statuses(undeliverable)
+
+
+def start_broadcast(bot: Bot, db: PostgresHandler, job: BroadcastJob) -> asyncio.Task:
+    """Запустить рассылку в фоне."""
+    task = run_in_background(_run_job(bot, db, job))
+    _running[job.id] = task
+
+    def forget(_: asyncio.Task) -> None:
+        _running.pop(job.id, None)
+        _stop_requested.discard(job.id)
+
+    task.add_done_callback(forget)
+    return task
+
+
+def stop_broadcast(job_id: int) -> bool:
+    """
+    Остановить выполняющуюся рассылку.
+
+    Returns:
+        False, если рассылка уже завершена
+    """
+    task = _running.get(job_id)
+    if task is None or task.done():
+        return False
+    _stop_requested.add(job_id)
+    task.cancel()
+    return True
+
+
+async def shutdown_broadcasts() -> None:
+    """
+    Прервать выполняющиеся рассылки при остановке бота.
+
+    Результаты доставки из буферов сохраняются, рассылки остаются
+    в статусе running и продолжаются при следующем запуске.
+    """
+    tasks = [task for task in _running.values() if not task.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if tasks:
+        logger.info(f"Прервано рассылок: {len(tasks)}")
+
+
+async def resume_broadcasts(bot: Bot, db: PostgresHandler) -> None:
+    """Продолжить рассылки, прерванные остановкой бота."""
+    for job in await db.broadcasts.get_unfinished():
+        logger.info(f"Возобновление рассылки {job.id} ({job.kind})")
+        start_broadcast(bot, db, job)
+
+
+def _build_send_method(job: BroadcastJob, chat_id: int):
+    """Запрос отправки сообщения рассылки."""
+    if job.photo_file_id:
+        return SendPhoto(
+            chat_id=chat_id, photo=job.photo_file_id, caption=job.text or None
+        )
+    if job.document_file_id:
+        return SendDocument(
+            chat_id=chat_id, document=job.document_file_id, caption=job.text or None
+        )
+    return SendMessage(chat_id=chat_id, text=job.text)
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes} мин {seconds} с" if minutes else f"{seconds} с"
+
+
+def _render_progress(job: BroadcastJob, stats: BroadcastStats, pinned: int) -> str:
+    """Текст сообщения с прогрессом рассылки."""
+    title = {
+        BroadcastJob.KIND_UNPIN: "📌 Открепление",
+        BroadcastJob.KIND_DELETE: "🗑 Удаление",
+    }.get(job.kind, "📤 Рассылка")
+    lines = [
+        f"{title}: {stats.done}/{stats.total}",
+        f"✅ Успешно: {stats.sent}",
+        f"❌ Ошибок: {stats.failed}",
+    ]
+    if job.kind == BroadcastJob.KIND_PIN:
+        lines.append(f"📌 Закреплено: {pinned}")
+    eta = stats.eta
+    lines.append(
+        f"⏱ Осталось: ~{_format_duration(eta)}" if eta is not None else "⏱ Осталось: …"
+    )
+    return "\n".join(lines)
+
+
+class ProgressMessage:
+    """
+    Сообщение админу с прогрессом рассылки.
+
+    Обновляется не чаще раза в PROGRESS_INTERVAL секунд и только если
+    текст изменился: счётчики между обновлениями объединяются, поэтому
+    редактирования почти не расходуют лимит запросов бота.
+    """
+
+    def __init__(self, bot: Bot, job: BroadcastJob, stats: BroadcastStats) -> None:
+        self.bot = bot
+        self.job = job
+        self.stats = stats
+        self.pinned = 0
+        self.message: Message | None = None
+        self._text = ""
+
+    async def send(self) -> None:
+        self._text = _render_progress(self.job, self.stats, self.pinned)
+        self.message = await self.bot.send_message(
+            self.job.admin_id,
+            self._text,
+            reply_markup=get_broadcast_stop_keyboard(self.job.id),
+        )
+
+    async def run(self) -> None:
+        """Периодически обновлять прогресс (до отмены задачи)."""
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            text = _render_progress(self.job, self.stats, self.pinned)
+            if text == self._text:
+                continue
+            try:
+                await self._edit(text, get_broadcast_stop_keyboard(self.job.id))
+            except TelegramRetryAfter as e:
+                await asyncio.sleep(e.retry_after)
+            except TelegramBadRequest as e:
+                logger.warning(f"Не удалось обновить прогресс рассылки: {e}")
+
+    async def finish(self, text: str, reply_markup=None) -> None:
+        """Заменить прогресс итоговым текстом (без кнопки остановки)."""
+        if self.message is None:
+            await self.bot.send_message(
+                self.job.admin_id, text, reply_markup=reply_markup
+            )
+            return
+        await self._edit(text, reply_markup)
+
+    async def _edit(self, text: str, reply_markup) -> None:
+        self._text = text
+        await self.bot.edit_message_text(
+            text=text,
+            chat_id=self.message.chat.id,
+            message_id=self.message.message_id,
+            reply_markup=reply_markup,
+        )
+
+
+async def _deliver(
+    bot: Bot,
+    job: BroadcastJob,
+    chat_id: int,
+    message_id: int | None,
+) -> tuple[int | None, bool]:
+    """
+    Выполнить рассылку для одного чата.
+
+    Returns:
+        (message_id сообщения, закреплено ли оно)
+    """
+    if job.kind == BroadcastJob.KIND_DELETE:
+        await bot(DeleteMessage(chat_id=chat_id, message_id=message_id))
+        return message_id, False
+
+    if job.kind == BroadcastJob.KIND_UNPIN:
+        if message_id is None:
+            await bot(UnpinAllChatMessages(chat_id=chat_id))
+        else:
+            await bot(UnpinChatMessage(chat_id=chat_id, message_id=message_id))
+        return message_id, False
+
+    sent_msg = await bot(_build_send_method(job, chat_id))
+    try:
+        await bot(PinChatMessage(chat_id=chat_id, message_id=sent_msg.message_id))
+    except Exception:
+        # Ошибка закрепления не считается ошибкой доставки
+        return sent_msg.message_id, False
+    return sent_msg.message_id, True
+
+
+def _render_report(job: BroadcastJob, counts: dict[str, int], stats: BroadcastStats) -> str:
+    """Итоговый отчёт рассылки."""
+    sent = counts.get(BroadcastDelivery.STATUS_SENT, 0)
+    failed = counts.get(BroadcastDelivery.STATUS_FAILED, 0)
+    if job.kind == BroadcastJob.KIND_UNPIN:
+        return (
+            f"✅ Сообщения откреплены:\n"
+            f"📌 Успешно откреплено: {sent}\n"
+            f"❌ Ошибок: {failed}\n"
+            f"⏱ {stats.elapsed:.0f} с ({stats.rate:.1f} запр./с)"
+        )
+    if job.kind == BroadcastJob.KIND_DELETE:
+        return (
+            f"✅ Сообщения рассылки {job.source_job_id} удалены:\n"
+            f"🗑 Успешно удалено: {sent}\n"
+            f"❌ Ошибок: {failed}\n"
+            f"⏱ {stats.elapsed:.0f} с ({stats.rate:.1f} запр./с)"
+        )
+    return (
+        f"✅ Сообщение разослано (рассылка {job.id}):\n"
+        f"📤 Успешно отправлено: {sent}\n"
+        f"❌ Ошибок: {failed}\n"
+        f"📌 Закреплено: {counts.get('pinned', 0)}\n"
+        f"⏱ {stats.elapsed:.0f} с ({stats.rate:.1f} сообщ./с)"
+    )
+
+
+async def _run_job(bot: Bot, db: PostgresHandler, job: BroadcastJob) -> None:
+    """Выполнить рассылку для оставшихся получателей с отображением прогресса"""
+    broadcaster = Broadcaster()
+    recorder = DeliveryRecorder(db, job)
+    stats = BroadcastStats()
+    progress = ProgressMessage(bot, job, stats)
+    pending: dict[int, int | None] = {}
+
+    async def pending_chunks() -> AsyncIterator[list[int]]:
+        # Получатели читаются пачками; следующая пачка запрашивается,
+        # когда обработана предыдущая
+        nonlocal pending
+        async for pending in db.broadcasts.iter_pending(job.id):
+            yield list(pending)
+
+    async def deliver(chat_id: int) -> None:
+        try:
+            message_id, is_pinned = await _deliver(
+                bot, job, chat_id, pending[chat_id]
+            )
+        except Exception as e:
+            await recorder.record(
+                chat_id,
+                BroadcastDelivery.STATUS_FAILED,
+                message_id=pending[chat_id],
+                undeliverable=undeliverable_reason(e),
+            )
+            raise
+        if is_pinned:
+            progress.pinned += 1
+        await recorder.record(
+            chat_id,
+            BroadcastDelivery.STATUS_SENT,
+            message_id=message_id,
+            is_pinned=is_pinned,
+        )
+
+    progress_task: asyncio.Task | None = None
+    try:
+        counts = await db.broadcasts.count_deliveries(job.id)
+        stats.total = counts.get(BroadcastDelivery.STATUS_PENDING, 0)
+        await progress.send()
+        progress_task = asyncio.create_task(progress.run())
+
+        await broadcaster.run(pending_chunks(), deliver, stats=stats)
+        progress_task.cancel()
+        await recorder.flush()
+        await db.broadcasts.finish(job.id)
+
+        # Итоги с учётом доставок до перезапуска
+        counts = await db.broadcasts.count_deliveries(job.id)
+        await progress.finish(
+            _render_report(job, counts, stats),
+            reply_markup=get_broadcast_actions_keyboard(job.id)
+            if job.kind == BroadcastJob.KIND_PIN
+            else None,
+        )
+
+    except asyncio.CancelledError:
+        if progress_task is not None:
+            progress_task.cancel()
+        await recorder.flush()
+        if job.id not in _stop_requested:
+            # Остановка бота: рассылка остаётся running и продолжится
+            # при следующем запуске (resume_broadcasts)
+            raise
+
+        # Остановка кнопкой: сохраняем статусы и больше не возобновляем
+        await db.broadcasts.finish(job.id, status=BroadcastJob.STATUS_CANCELLED)
+        await progress.finish(
+            f"⏹ Рассылка остановлена\n"
+            f"✅ Успешно: {stats.sent}\n"
+            f"❌ Ошибок: {stats.failed}\n"
+            f"⏳ Не обработано: {stats.total - stats.done}",
+            reply_markup=get_broadcast_actions_keyboard(job.id)
+            if job.kind == BroadcastJob.KIND_PIN
+            else None,
+        )
+        raise
+
+    except Exception as e:
+        if progress_task is not None:
+            progress_task.cancel()
+        logger.exception(f"Ошибка при выполнении рассылки {job.id}: {e}")
+        await bot.send_message(job.admin_id, "❌ Произошла ошибка при рассылке сообщения.")
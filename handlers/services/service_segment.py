@@ -0,0 +1,88 @@
+"""
+Сегменты получателей рассылок администратора.
+
+/pin_message [сегмент]:
+- all — все пользователи (по умолчанию);
+- admins — администраторы;
+- collectors — коллекторы;
+- month <1-12> — пользователи с днём рождения в этом месяце;
+- active <N> — пользователи, писавшие боту за последние N дней.
+"""
+
+from db_handler import PostgresHandler
+
+SEGMENT_ALL = "all"
+SEGMENT_ADMINS = "admins"
+SEGMENT_COLLECTORS = "collectors"
+SEGMENT_BIRTH_MONTH = "month"
+SEGMENT_ACTIVE = "active"
+
+SEGMENT_USAGE = (
+    "❌ Использование: /pin_message [сегмент]\n"
+    "• all — все пользователи (по умолчанию)\n"
+    "• admins — администраторы\n"
+    "• collectors — коллекторы\n"
+    "• month &lt;1-12&gt; — день рождения в этом месяце\n"
+    "• active &lt;N&gt; — писали боту за последние N дней"
+)
+
+
+def parse_segment(args: str | None) -> tuple[str, int | None]:
+    """
+    Разобрать аргументы команды в сегмент.
+
+    Returns:
+        (сегмент, параметр сегмента или None)
+
+    Raises:
+        ValueError: если сегмент указан неверно
+    """
+    if not args or not args.strip():
+        return SEGMENT_ALL, None
+
+    name, *params = args.lower().split()
+    if name in (SEGMENT_ALL, SEGMENT_ADMINS, SEGMENT_COLLECTORS) and not params:
+        return name, None
+
+    if name in (SEGMENT_BIRTH_MONTH, SEGMENT_ACTIVE) and len(params) == 1:
+        value = int(params[0])
+        if name == SEGMENT_BIRTH_MONTH and 1 <= value <= 12:
+            return name, value
+        if name == SEGMENT_ACTIVE and value > 0:
+            return name, value
+
+    raise ValueError(f"Неизвестный сегмент: {args}")
+
+
+def describe_segment(segment: str, value: int | None = None) -> str:
+    """Описание сегмента для админа."""
+    if segment == SEGMENT_ADMINS:
+        return "администраторам"
+    if segment == SEGMENT_COLLECTORS:
+        return "коллекторам"
+    if segment == SEGMENT_BIRTH_MONTH:
+        return f"пользователям с днём рождения в месяце {value:02d}"
+    if segment == SEGMENT_ACTIVE:
+        return f"пользователям, активным за последние {value} дн."
+    return "всем пользователям"
+
+
+async def get_segment_ids(
+    db: PostgresHandler, segment: str, value: int | None = None
+) -> list[int] | None:
+    """
+    ID получателей сегмента (одним запросом, без загрузки пользователей).
+
+    Returns:
+        None для сегмента «все пользователи» — получатели выбираются
+        при создании рассылки (INSERT ... SELECT)
+    """
+    if segment == SEGMENT_ADMINS:
+        return await db.users.get_admin_ids()
+    if segment == SEGMENT_COLLECTORS:
+        return await db.users.get_collector_ids()
+    if segment == SEGMENT_BIRTH_MONTH:
+        return await db.users.get_ids_by_birth_month(value)
+    if segment == SEGMENT_ACTIVE:
+        return await db.users.get_active_ids(value)
+    return None
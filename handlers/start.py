@@ -1,9 +1,41 @@
 from keyboards.register_keyboards import get_registration_keyboard
-from aiogram.filters import CommandStart
+from keyboards.birthday_keyboards import GIFT_LINK_PREFIX
+from aiogram.filters import CommandObject, CommandStart
+from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
-from aiogram import Router
+from aiogram import F, Router
+import logging
+
+from db_handler import PostgresHandler
+from handlers.birthday_handler import begin_gift_suggestion
 
 start_router = Router()
+logger = logging.getLogger(__name__)
+
+
+@start_router.message(
+    CommandStart(deep_link=True, magic=F.args.startswith(GIFT_LINK_PREFIX))
+)
+async def cmd_start_gift(
+    message: Message,
+    command: CommandObject,
+    state: FSMContext,
+    db: PostgresHandler,
+):
+    """Переход по кнопке «Предложить подарок» из объявления в группе."""
+    try:
+        birthday_user_id = int(command.args.removeprefix(GIFT_LINK_PREFIX))
+    except ValueError:
+        await message.answer("❌ Некорректная ссылка")
+        return
+
+    try:
+        error = await begin_gift_suggestion(message, state, db, birthday_user_id)
+    except Exception as e:
+        logger.exception(f"Ошибка при переходе по ссылке на предложение подарка: {e}")
+        error = "Ошибка при загрузке данных"
+    if error:
+        await message.answer(f"❌ {error}")
 
 
 @start_router.message(CommandStart())
@@ -1,7 +1,8 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from states.user_states import WishStates
+from filters.exact import DataEquals
 from db_handler import PostgresHandler
 from exceptions import RecordNotFound
 from keyboards.wishlist_keyboards import (
@@ -47,7 +48,7 @@ async def process_wish_text(message: Message, state: FSMContext):
         await state.set_state(WishStates.waiting_for_wish_url)
 
 
-@wishlist_router.callback_query(F.data == "url_no", WishStates.waiting_for_wish_url)
+@wishlist_router.callback_query(DataEquals("url_no"), WishStates.waiting_for_wish_url)
 async def process_url_no(callback: CallbackQuery, state: FSMContext):
     """Обработка кнопки 'Нет ссылки 🔗'"""
     await state.update_data(wish_url=None)
@@ -66,7 +67,7 @@ async def process_url(message: Message, state: FSMContext):
 # ============ Подтверждение желания ============
 
 
-@wishlist_router.callback_query(F.data == "confirm_yes", WishStates.confirmation)
+@wishlist_router.callback_query(DataEquals("confirm_yes"), WishStates.confirmation)
 async def confirm_wish(callback: CallbackQuery, state: FSMContext, db: PostgresHandler):
     """Подтверждение желания"""
     data = await state.get_data()
@@ -110,7 +111,7 @@ async def confirm_wish(callback: CallbackQuery, state: FSMContext, db: PostgresH
 # ============ Редактирование желания ============
 
 
-@wishlist_router.callback_query(F.data == "confirm_no", WishStates.confirmation)
+@wishlist_router.callback_query(DataEquals("confirm_no"), WishStates.confirmation)
 async def show_wish_edit_menu(callback: CallbackQuery, state: FSMContext):
     """Показать меню редактирования желания"""
     await callback.message.edit_reply_markup(reply_markup=get_edit_wishdata_keyboard())
@@ -118,7 +119,7 @@ async def show_wish_edit_menu(callback: CallbackQuery, state: FSMContext):
     await state.update_data(is_edit=True)
 
 
-@wishlist_router.callback_query(F.data == "edit_wish_text", WishStates.confirmation)
+@wishlist_router.callback_query(DataEquals("edit_wish_text"), WishStates.confirmation)
 async def edit_wish_text(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_reply_markup()
     await callback.message.answer("Введите новый текст желания ✏️:")
@@ -126,7 +127,7 @@ async def edit_wish_text(callback: CallbackQuery, state: FSMContext):
     await state.set_state(WishStates.waiting_for_wish_text)
 
 
-@wishlist_router.callback_query(F.data == "edit_wish_url", WishStates.confirmation)
+@wishlist_router.callback_query(DataEquals("edit_wish_url"), WishStates.confirmation)
 async def edit_wish_url(callback: CallbackQuery, state: FSMContext):
     await callback.message.edit_reply_markup()
     await callback.message.answer(
@@ -2,6 +2,9 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 SET_ACTIVE_COLLECTOR = "admin_set_collector"
 DELETE_USER = "admin_delete_user"
+STOP_BROADCAST = "admin_stop_broadcast:"
+UNPIN_BROADCAST = "admin_unpin_broadcast:"
+DELETE_BROADCAST = "admin_delete_broadcast:"
 
 
 def get_admin_main_keyboard() -> InlineKeyboardMarkup:
@@ -40,3 +43,35 @@ def get_confirm_action_keyboard(
             ]
         ]
     )
+
+
+def get_broadcast_stop_keyboard(job_id: int) -> InlineKeyboardMarkup:
+    """Клавиатура остановки рассылки"""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="⏹ Остановить рассылку",
+                    callback_data=f"{STOP_BROADCAST}{job_id}",
+                ),
+            ]
+        ]
+    )
+
+
+def get_broadcast_actions_keyboard(job_id: int) -> InlineKeyboardMarkup:
+    """Клавиатура действий с завершённой рассылкой"""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(
+                    text="📌 Открепить",
+                    callback_data=f"{UNPIN_BROADCAST}{job_id}",
+                ),
+                InlineKeyboardButton(
+                    text="🗑 Удалить у всех",
+                    callback_data=f"{DELETE_BROADCAST}{job_id}",
+                ),
+            ]
+        ]
+    )
@@ -7,21 +7,34 @@ BUTTON_WISHLISTS = "👥❤️ Вишлисты"
 # callback для просмотра вишлистов из раздела дней рождений
 BIRTHDAYS_WISHLISTS = "birthdays_wishlists"
 
+# Параметр /start ссылки на предложение подарка: gift_<user_id>
+GIFT_LINK_PREFIX = "gift_"
 
-def get_birthday_actions_keyboard(user_id: int) -> InlineKeyboardMarkup:
+
+def _get_gift_button(
+    text: str, user_id: int, gift_links: dict[int, str] | None
+) -> InlineKeyboardButton:
+    """Кнопка предложения подарка: callback или ссылка на бота."""
+    if gift_links:
+        return InlineKeyboardButton(text=text, url=gift_links[user_id])
+    return InlineKeyboardButton(text=text, callback_data=f"suggest_gift:{user_id}")
+
+
+def get_birthday_actions_keyboard(
+    user_id: int, gift_links: dict[int, str] | None = None
+) -> InlineKeyboardMarkup:
     """Клавиатура с действиями для дня рождения.
 
     Содержит кнопки:
     - Предложить подарок
+
+    Args:
+        gift_links: {user_id: ссылка на бота} — для сообщений в группе,
+            где предложение подарка продолжается в личном чате с ботом
     """
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [
-                InlineKeyboardButton(
-                    text=BUTTON_SUGGEST_GIFT,
-                    callback_data=f"suggest_gift:{user_id}",
-                )
-            ],
+            [_get_gift_button(BUTTON_SUGGEST_GIFT, user_id, gift_links)],
         ]
     )
 
@@ -42,3 +55,23 @@ def get_birthdays_keyboard() -> InlineKeyboardMarkup:
             ]
         ]
     )
+
+
+def get_birthday_digest_keyboard(
+    birthday_users: list[tuple[int, str]],
+    gift_links: dict[int, str] | None = None,
+) -> InlineKeyboardMarkup:
+    """Клавиатура дайджеста дней рождений.
+
+    Содержит по кнопке «Предложить подарок» на каждого именинника.
+
+    Args:
+        birthday_users: [(user_id, инициалы именинника)]
+        gift_links: {user_id: ссылка на бота} — для сообщений в группе
+    """
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [_get_gift_button(f"🎁 Подарок: {initials}", user_id, gift_links)]
+            for user_id, initials in birthday_users
+        ]
+    )
@@ -1,6 +1,9 @@
 from .check_registr import RegistrationMiddleware
 from .role import RoleMiddleware, RequireAdmin, RequireServiceUser, RequireCollector
 from .di import DIMiddleware
+from .throttling import ThrottlingMiddleware
+from .concurrency import ConcurrencyLimitMiddleware
+from .request_limiter import RequestLimiterMiddleware
 
 __all__ = [
     "DIMiddleware",
@@ -9,5 +12,8 @@ __all__ = [
     "RequireAdmin",
     "RequireServiceUser",
     "RequireCollector",
+    "ThrottlingMiddleware",
+    "ConcurrencyLimitMiddleware",
+    "RequestLimiterMiddleware",
 ]
 
@@ -1,29 +1,52 @@
 import logging
+from datetime import datetime, timedelta
 from collections.abc import Callable, Awaitable
 from typing import Any
 
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 
-from db_handler import PostgresHandler
+from db_handler.cache import user_cache
+from db_handler.models import User
 from keyboards.register_keyboards import get_registration_keyboard
+from utils.cache import TTLCache
 from keyboards.main_menu_keyboards import get_main_menu_keyboard
-from exceptions import RecordNotFound
+from .dependencies import requires, resolve_user, resolve_active_collector
 
 logger = logging.getLogger(__name__)
 
+REGISTRATION_PROMPT_INTERVAL = 30  # секунд
+# Как часто обновлять users.last_seen_at
+LAST_SEEN_INTERVAL = timedelta(hours=1)
+
+# Кому недавно отправлялось предложение зарегистрироваться
+_registration_prompts: TTLCache[int, bool] = TTLCache(
+    maxsize=10000, ttl=REGISTRATION_PROMPT_INTERVAL
+)
+
 
 class RegistrationMiddleware(BaseMiddleware):
     """Middleware для проверки регистрации пользователя.
 
-    Загружает пользователя из БД и добавляет в data.
-    Если не зарегистрирован - предлагает зарегистрироваться.
+    Загружает пользователя (из кэша или БД) и добавляет в data.
+    Если не зарегистрирован - предлагает зарегистрироваться
+    (не чаще раза в REGISTRATION_PROMPT_INTERVAL секунд).
+    Незарегистрированные user_id кэшируются, повторные апдейты
+    от них не обращаются к БД.
 
     Пропускает без регистрации:
     - Команду /start
     - Callback 'register'
     - Все состояния, начинающиеся с 'UserDataStates:'
-    
+
+    Шаги остальных FSM-сценариев пропускаются без загрузки пользователя,
+    если хендлеру не нужен user: в сценарий можно попасть только после
+    проверки регистрации. Активность такого пользователя отмечается,
+    только если он есть в кэше, — БД для этого не запрашивается.
+
+    user и active_collector загружаются, только если хендлер их объявил
+    (см. middlewares.dependencies).
+
     Требует: DIMiddleware должен быть зарегистрирован раньше.
     """
 
@@ -38,31 +61,34 @@ class RegistrationMiddleware(BaseMiddleware):
         event: Message | CallbackQuery,
         data: dict[str, Any],
     ) -> Any:
-        db: PostgresHandler = data["db"]  # Получаем db из DIMiddleware
-        user_id = event.from_user.id
+        current_state: str | None = data.get("raw_state")
 
-        # Загружаем пользователя (связи administrator, collector, service_user
-        # загружаются автоматически благодаря lazy="joined")
+        # Шаг FSM-сценария, которому нужен только state
+        if (
+            current_state
+            and not current_state.startswith(self.USER_DATA_STATE_PREFIX)
+            and not requires(data, "user")
+        ):
+            cached_user = user_cache.get(event.from_user.id)
+            if cached_user is not None:
+                await self._touch(data, cached_user)
+            return await self._call_handler(handler, event, data)
+
+        # Загружаем пользователя вместе с administrator, collector и
+        # service_user одним запросом (LEFT JOIN).
+        # Зарегистрированные пользователи кэшируются, репозитории
+        # инвалидируют кэш при изменении данных.
         try:
-            user = await db.get_user(user_id)
-        except RecordNotFound:
-            user = None
+            user = await resolve_user(data)
         except Exception as e:
-            logger.exception(f"Ошибка при загрузке пользователя {user_id}: {e}")
+            logger.exception(
+                f"Ошибка при загрузке пользователя {event.from_user.id}: {e}"
+            )
             await event.answer("Ошибка сервера при проверке регистрации")
             return
 
-        # Добавляем пользователя в data
-        data["user"] = user
-
         # Если пользователь зарегистрирован
         if user:
-            # Загружаем активного коллектора (нужен для отображения данных сбора)
-            try:
-                data["active_collector"] = await db.get_active_collector()
-            except RecordNotFound:
-                data["active_collector"] = None
-
             # Если пытается зарегистрироваться повторно
             if (
                 isinstance(event, CallbackQuery)
@@ -78,13 +104,13 @@ class RegistrationMiddleware(BaseMiddleware):
                 )
                 return
 
-            return await handler(event, data)
+            await self._touch(data, user)
+            return await self._call_handler(handler, event, data)
 
         # Пользователь не зарегистрирован
         data["active_collector"] = None
 
         # Проверяем состояние FSM (для процесса регистрации)
-        current_state: str | None = data.get("raw_state")
         if current_state and current_state.startswith(self.USER_DATA_STATE_PREFIX):
             return await handler(event, data)
 
@@ -95,8 +121,42 @@ class RegistrationMiddleware(BaseMiddleware):
         if isinstance(event, CallbackQuery) and event.data in self.REGISTER_CALLBACKS:
             return await handler(event, data)
 
-        # Предлагаем зарегистрироваться
+        # Предлагаем зарегистрироваться (повторно — не чаще интервала)
+        user_id = event.from_user.id
+        if _registration_prompts.get(user_id, False):
+            if isinstance(event, CallbackQuery):
+                await event.answer()
+            return
+
+        _registration_prompts.set(user_id, True)
         await event.answer(
             "Вы не зарегистрированы.\nДля регистрации нажмите на кнопку 📝:",
             reply_markup=get_registration_keyboard(),
         )
+
+    @staticmethod
+    async def _touch(data: dict[str, Any], user: User) -> None:
+        """
+        Отметить активность пользователя (для рассылок по сегменту
+        «активные за N дней»). Раз он пишет боту — сообщения ему снова
+        доставляются.
+        """
+        if (
+            not user.is_deliverable
+            or user.last_seen_at is None
+            or datetime.now() - user.last_seen_at > LAST_SEEN_INTERVAL
+        ):
+            await data["db"].users.touch(user.user_id)
+
+    @staticmethod
+    async def _call_handler(
+        handler: Callable[[Message | CallbackQuery, dict[str, Any]], Awaitable[Any]],
+        event: Message | CallbackQuery,
+        data: dict[str, Any],
+    ) -> Any:
+        """Вызвать хендлер, загрузив объявленные им зависимости."""
+        if requires(data, "active_collector"):
+            # CollectorRepository держит активного коллектора в кэше процесса
+            await resolve_active_collector(data)
+
+        return await handler(event, data)
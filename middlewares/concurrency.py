@@ -0,0 +1,105 @@
+"""
+Middleware для ограничения числа одновременно выполняемых хендлеров.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Awaitable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+MSG_BUSY = "⏳ Бот сейчас перегружен, попробуйте чуть позже"
+
+
+class ConcurrencyLimitMiddleware(BaseMiddleware):
+    """
+    Ограничение числа апдейтов, обрабатываемых одновременно.
+
+    Не больше limit апдейтов обрабатываются одновременно (и держат
+    соединения из пула БД), следующие queue_size ждут в очереди.
+    Сверх очереди апдейт отбрасывается: пользователь получает ответ
+    "бот перегружен", к БД обращений нет.
+
+    Регистрируется как outer middleware апдейтов после FSMContextMiddleware:
+
+        dp.update.outer_middleware(ConcurrencyLimitMiddleware(limit=10, queue_size=200))
+
+    Апдейты, ждущие предыдущий апдейт того же пользователя
+    (UserEventIsolation), места в очереди не занимают.
+    """
+
+    def __init__(self, limit: int, queue_size: int) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self._semaphore = asyncio.Semaphore(limit)
+
+        # Метрики
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.processed = 0
+        self.shed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: dict[str, Any],
+    ) -> Any:
+        if self._semaphore.locked() and self.queued >= self.queue_size:
+            self.shed += 1
+            logger.warning(
+                f"Апдейт {event.update_id} отброшен: "
+                f"в обработке {self.in_flight}, в очереди {self.queued}"
+            )
+            await self._answer_busy(event)
+            return
+
+        started = time.monotonic()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - started
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+        self.in_flight += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self.in_flight -= 1
+            self.processed += 1
+            self._semaphore.release()
+
+    @staticmethod
+    async def _answer_busy(event: Update) -> None:
+        """Ответить пользователю без обращения к БД."""
+        if event.message:
+            await event.message.answer(MSG_BUSY)
+        elif event.callback_query:
+            await event.callback_query.answer(MSG_BUSY)
+
+    def stats(self) -> dict[str, int | float]:
+        """Текущая загрузка, очередь, время ожидания и число отброшенных."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "processed": self.processed,
+            "shed": self.shed,
+            "avg_wait": round(self.wait_total / self.processed, 3)
+            if self.processed
+            else 0.0,
+            "max_wait": round(self.wait_max, 3),
+        }
@@ -0,0 +1,78 @@
+"""
+Ленивое разрешение зависимостей хендлеров.
+
+Хендлер объявляет, что ему нужно, параметрами сигнатуры:
+
+    async def show_collector_panel(message: Message, user: User): ...
+
+или флагом deps (если зависимость нужна не самому хендлеру,
+а вызываемому из него коду):
+
+    @router.message(TextEquals(BUTTON), flags={"deps": {"user"}})
+
+Middleware загружают только объявленные зависимости и только один раз
+за апдейт (результат сохраняется в data).
+"""
+
+from typing import Any
+
+from aiogram.dispatcher.flags import get_flag
+
+from db_handler import PostgresHandler
+from db_handler.cache import user_cache, unregistered_cache
+from db_handler.models import Collector, User
+from exceptions import RecordNotFound
+
+
+def requires(data: dict[str, Any], name: str) -> bool:
+    """Нужна ли зависимость name хендлеру текущего апдейта."""
+    handler = data.get("handler")
+    if handler is None:
+        return True
+    if handler.varkw or name in handler.params:
+        return True
+    return name in get_flag(handler, "deps", default=())
+
+
+async def resolve_user(data: dict[str, Any]) -> User | None:
+    """
+    Загрузить пользователя текущего апдейта (из кэша или БД).
+
+    Returns:
+        User или None, если пользователь не зарегистрирован
+    """
+    if "user" in data:
+        return data["user"]
+
+    db: PostgresHandler = data["db"]
+    user_id = data["event_from_user"].id
+
+    user = user_cache.get(user_id)
+    if user is None and not unregistered_cache.get(user_id, False):
+        cache_version = user_cache.version
+        unregistered_version = unregistered_cache.version
+        try:
+            user = await db.get_user_with_roles(user_id)
+        except RecordNotFound:
+            user = None
+            unregistered_cache.set(user_id, True, version=unregistered_version)
+        else:
+            user_cache.set(user_id, user, version=cache_version)
+
+    data["user"] = user
+    return user
+
+
+async def resolve_active_collector(data: dict[str, Any]) -> Collector | None:
+    """Загрузить активного коллектора (None, если не назначен)."""
+    if "active_collector" in data:
+        return data["active_collector"]
+
+    db: PostgresHandler = data["db"]
+    try:
+        collector = await db.get_active_collector()
+    except RecordNotFound:
+        collector = None
+
+    data["active_collector"] = collector
+    return collector
@@ -1,7 +1,8 @@
 """
 Middleware для Dependency Injection.
 
-Добавляет зависимости в data, чтобы handlers могли получать их как параметры.
+Добавляет зависимости в data, чтобы handlers могли получать их как параметры,
+и открывает unit of work БД на время обработки апдейта.
 """
 
 from collections.abc import Callable, Awaitable
@@ -11,6 +12,7 @@ from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 
 from db_handler import PostgresHandler
+from utils.outbox import Outbox
 
 
 class DIMiddleware(BaseMiddleware):
@@ -18,12 +20,18 @@ class DIMiddleware(BaseMiddleware):
     Middleware для инъекции зависимостей.
     
     Использование в handler:
-        async def my_handler(message: Message, db: PostgresHandler):
+        async def my_handler(message: Message, db: PostgresHandler, outbox: Outbox):
             user = await db.get_user(message.from_user.id)
+            await outbox.send(other_user_id, "Текст")
+
+    Все обращения репозиториев к БД за время апдейта идут через одну
+    лениво открываемую сессию; commit выполняется после хендлера,
+    rollback — при исключении.
     """
 
-    def __init__(self, db: PostgresHandler) -> None:
+    def __init__(self, db: PostgresHandler, outbox: Outbox) -> None:
         self.db = db
+        self.outbox = outbox
 
     async def __call__(
         self,
@@ -33,6 +41,8 @@ class DIMiddleware(BaseMiddleware):
     ) -> Any:
         # Инжектим зависимости в data
         data["db"] = self.db
-        
-        return await handler(event, data)
+        data["outbox"] = self.outbox
+
+        async with self.db.request_scope():
+            return await handler(event, data)
 
@@ -0,0 +1,279 @@
+"""
+Middleware сессии бота для ограничения частоты запросов к Bot API.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import (
+    AnswerCallbackQuery,
+    CopyMessage,
+    DeleteMessage,
+    DeleteMessages,
+    EditMessageCaption,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessage,
+    GetUpdates,
+    PinChatMessage,
+    SendDocument,
+    SendMessage,
+    SendPhoto,
+    UnpinAllChatMessages,
+    UnpinChatMessage,
+)
+from aiogram.methods.base import Response, TelegramMethod, TelegramType
+
+from utils.cache import TTLCache
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+
+# Классы лимитов методов Bot API: дополнительный лимит внутри общего
+# (методы без класса ограничиваются только общим лимитом)
+METHOD_LIMITS: dict[type[TelegramMethod], str] = {
+    SendMessage: "send",
+    SendPhoto: "send",
+    SendDocument: "send",
+    CopyMessage: "send",
+    ForwardMessage: "send",
+    EditMessageText: "edit",
+    EditMessageCaption: "edit",
+    EditMessageReplyMarkup: "edit",
+    DeleteMessage: "edit",
+    DeleteMessages: "edit",
+    PinChatMessage: "edit",
+    UnpinChatMessage: "edit",
+    UnpinAllChatMessages: "edit",
+}
+
+# Long polling сам повторяет запросы — его не ограничиваем и не повторяем
+SKIP_METHODS: tuple[type[TelegramMethod], ...] = (GetUpdates,)
+
+# Методы, которые можно безопасно повторить после сетевой ошибки или
+# ошибки сервера: запрос мог быть выполнен Telegram, но повтор ничего
+# не меняет. Отправка сообщения при повторе продублировала бы его
+IDEMPOTENT_METHODS: tuple[type[TelegramMethod], ...] = (
+    EditMessageText,
+    EditMessageCaption,
+    EditMessageReplyMarkup,
+    DeleteMessage,
+    DeleteMessages,
+    PinChatMessage,
+    UnpinChatMessage,
+    UnpinAllChatMessages,
+    AnswerCallbackQuery,
+)
+
+# В группу — не больше 20 сообщений в минуту
+GROUP_CHAT_LIMIT = (20 / 60, 3)
+
+MAX_RETRIES = 3
+RETRY_DELAY = 1.0  # секунд, удваивается с каждой попыткой
+
+
+@dataclass(slots=True)
+class _Bucket:
+    rate: float
+    burst: int
+    tokens: float
+    updated: float
+    paused_until: float = 0.0
+
+    def reserve(self, now: float) -> float:
+        """
+        Занять токен и вернуть, сколько секунд ждать запроса.
+
+        Токены могут уходить в минус: каждый следующий запрос ждёт
+        дольше на 1 / rate, поэтому очередь ожидающих честная.
+        """
+        start = max(now, self.paused_until)
+        self.tokens = min(self.burst, self.tokens + (start - self.updated) * self.rate)
+        self.updated = start
+        self.tokens -= 1
+        deficit = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return start - now + deficit
+
+    def refund(self) -> None:
+        """Вернуть токен запроса, который не был отправлен."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class RequestLimiterMiddleware(BaseRequestMiddleware):
+    """
+    Общий лимит исходящих запросов к Bot API.
+
+    Все запросы бота (ответы хендлеров, рассылки, напоминания) проходят
+    через общий token bucket global_limit, а дополнительно — через ведро
+    класса лимита (см. METHOD_LIMITS) и ведро чата. Лимиты задаются как
+    в ThrottlingMiddleware: (rate, burst) — запросов в секунду и ёмкость
+    ведра, для классов — {класс: (rate, burst)}.
+
+    - TelegramRetryAfter: класс лимита и чат (для методов без класса —
+      все запросы) приостанавливаются на retry_after секунд, запрос
+      повторяется (до MAX_RETRIES раз);
+    - сетевые ошибки и ошибки сервера Telegram: повтор с
+      экспоненциальной задержкой и случайным разбросом, только для
+      идемпотентных методов (IDEMPOTENT_METHODS) — отправка сообщения
+      могла пройти, повтор прислал бы его дважды.
+
+    Использование:
+
+        bot.session.middleware(
+            RequestLimiterMiddleware(global_limit=(30, 30), limits={...}, ...)
+        )
+    """
+
+    def __init__(
+        self,
+        global_limit: tuple[float, int],
+        limits: dict[str, tuple[float, int]],
+        chat_limit: tuple[float, int],
+        maxsize: int = 10000,
+    ) -> None:
+        now = time.monotonic()
+        rate, burst = global_limit
+        self._global = _Bucket(rate, burst, tokens=burst, updated=now)
+        self._buckets = {
+            name: _Bucket(rate, burst, tokens=burst, updated=now)
+            for name, (rate, burst) in limits.items()
+        }
+        self.chat_limit = chat_limit
+        # Ведро без обращений дольше ttl соответствует полному
+        self._chat_buckets: TTLCache[int | str, _Bucket] = TTLCache(
+            maxsize=maxsize, ttl=600
+        )
+
+        self.waiting = 0
+        self.requests = 0
+        self.retry_after: Counter[str] = Counter()
+        self.network_retries = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if isinstance(method, SKIP_METHODS):
+            return await make_request(bot, method)
+
+        limit_name = METHOD_LIMITS.get(type(method))
+        buckets = self._get_buckets(limit_name, method)
+
+        for attempt in range(MAX_RETRIES + 1):
+            await self._acquire(buckets)
+            self.requests += 1
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                self.retry_after[limit_name or type(method).__name__] += 1
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(
+                    f"Flood control ({type(method).__name__}): пауза {e.retry_after} с"
+                )
+                # Ведра класса и чата; у метода без класса — общее ведро
+                paused = buckets[1:] or buckets
+                paused_until = time.monotonic() + e.retry_after
+                for bucket in paused:
+                    bucket.paused_until = max(bucket.paused_until, paused_until)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if attempt == MAX_RETRIES or not isinstance(
+                    method, IDEMPOTENT_METHODS
+                ):
+                    raise
+                self.network_retries += 1
+                delay = RETRY_DELAY * 2**attempt * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Ошибка запроса {type(method).__name__}, "
+                    f"повтор через {delay:.1f} с: {e}"
+                )
+                await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    def stats(self) -> dict:
+        """Запросов ждут лимита сейчас, всего запросов, ответов 429 по классам."""
+        return {
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "retry_after": dict(self.retry_after),
+            "network_retries": self.network_retries,
+        }
+
+    def _get_buckets(
+        self, limit_name: str | None, method: TelegramMethod
+    ) -> list[_Bucket]:
+        """Ведра, из которых запрос должен получить токен (общее — первое)."""
+        bucket = self._buckets.get(limit_name)
+        if bucket is None:
+            return [self._global]
+
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return [self._global, bucket]
+
+        chat_bucket = self._chat_buckets.get(chat_id)
+        if chat_bucket is None:
+            # Отрицательные ID и @username — группы и каналы
+            is_private = isinstance(chat_id, int) and chat_id > 0
+            rate, burst = self.chat_limit if is_private else GROUP_CHAT_LIMIT
+            chat_bucket = _Bucket(rate, burst, tokens=burst, updated=time.monotonic())
+        # Обновляем время жизни записи при каждом запросе
+        self._chat_buckets.set(chat_id, chat_bucket)
+        return [self._global, bucket, chat_bucket]
+
+    async def _acquire(self, buckets: list[_Bucket]) -> None:
+        """
+        Дождаться токенов во всех ведрах.
+
+        Токены занимаются по очереди: сначала чат и класс, общее ведро —
+        последним. Запрос, который ждёт свой чат или паузу после 429,
+        не держит токен общего лимита, поэтому ожидающие не уходят пачкой
+        сверх него. Если задачу отменили, занятые токены возвращаются.
+        """
+        taken: list[_Bucket] = []
+        self.waiting += 1
+        try:
+            while True:
+                for bucket in reversed(buckets):
+                    wait = bucket.reserve(time.monotonic())
+                    taken.append(bucket)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                # Пауза могла начаться, пока запрос ждал: токены возвращаем
+                # и занимаем заново после неё
+                delay = max(b.paused_until for b in buckets) - time.monotonic()
+                if delay <= 0:
+                    return
+                self._refund(taken)
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._refund(taken)
+            raise
+        finally:
+            self.waiting -= 1
+
+    @staticmethod
+    def _refund(taken: list[_Bucket]) -> None:
+        for bucket in taken:
+            bucket.refund()
+        taken.clear()
@@ -8,6 +8,8 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 
+from .dependencies import resolve_user
+
 
 class RoleMiddleware(BaseMiddleware):
     """
@@ -37,7 +39,9 @@ class RoleMiddleware(BaseMiddleware):
         event: Message | CallbackQuery,
         data: dict[str, Any],
     ) -> Any:
-        user = data.get("user")
+        # Пользователь мог быть не загружен RegistrationMiddleware,
+        # если хендлеру он не нужен
+        user = await resolve_user(data)
 
         # Проверяем роль
         has_role = False
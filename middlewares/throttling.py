@@ -0,0 +1,106 @@
+"""
+Middleware для ограничения частоты запросов пользователя.
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable, Awaitable
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import Message, CallbackQuery
+
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MSG_THROTTLED = "⏳ Слишком много запросов, подождите немного"
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated: float
+    notified: bool = False
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Token bucket на пользователя.
+
+    Лимиты задаются именованными классами {имя: (rate, burst)}:
+    rate — токенов в секунду, burst — ёмкость ведра. По умолчанию
+    используется класс "default", хендлер может указать другой флагом:
+
+        @router.message(TextEquals(BUTTON_BIRTHDAYS), flags={"throttling": "heavy"})
+
+    Для отдельного роутера можно зарегистрировать свой экземпляр.
+    Лишние апдейты отбрасываются до обращения к БД (middleware должен
+    быть зарегистрирован раньше DIMiddleware), пользователь получает
+    одно предупреждение на серию отброшенных апдейтов. На отброшенные
+    callback-и бот всё равно отвечает (без текста после предупреждения).
+    Все операции O(1), состояние хранится в памяти.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, int]],
+        maxsize: int = 10000,
+    ) -> None:
+        if "default" not in limits:
+            raise ValueError("Не задан лимит 'default'")
+        self.limits = limits
+        # Запись без обращений дольше ttl соответствует полному ведру
+        self._buckets: TTLCache[tuple[int, str], _Bucket] = TTLCache(
+            maxsize=maxsize, ttl=600
+        )
+        self.throttled: Counter[str] = Counter()
+
+    async def __call__(
+        self,
+        handler: Callable[[Message | CallbackQuery, dict[str, Any]], Awaitable[Any]],
+        event: Message | CallbackQuery,
+        data: dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        limit_name = get_flag(data, "throttling", default="default")
+        rate, burst = self.limits.get(limit_name, self.limits["default"])
+
+        key = (user.id, limit_name)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(tokens=burst, updated=now)
+            self._buckets.set(key, bucket)
+        else:
+            bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.notified = False
+            return await handler(event, data)
+
+        self.throttled[limit_name] += 1
+        logger.debug(f"Апдейт пользователя {user.id} отброшен (лимит {limit_name})")
+
+        if isinstance(event, CallbackQuery):
+            # На callback отвечаем всегда, иначе в клиенте до таймаута
+            # висит индикатор загрузки; текст — только один раз
+            await event.answer(None if bucket.notified else MSG_THROTTLED)
+            bucket.notified = True
+            return
+
+        if not bucket.notified:
+            bucket.notified = True
+            await event.answer(MSG_THROTTLED)
+
+    def stats(self) -> dict[str, int]:
+        """Количество отброшенных апдейтов по классам лимитов."""
+        return dict(self.throttled)
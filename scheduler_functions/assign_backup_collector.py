@@ -7,6 +7,7 @@ from aiogram import Bot
 from db_handler import PostgresHandler
 from config import get_settings
 from exceptions import RecordNotFound
+from utils.delivery import send_message_safe
 
 logger = logging.getLogger(__name__)
 
@@ -54,15 +55,10 @@ async def notify_admins_no_backup_config(bot: Bot, db: PostgresHandler) -> None:
         )
 
         for admin in admins:
-            try:
-                await bot.send_message(admin.user_id, message)
+            if not admin.user.is_deliverable:
+                continue
+            if await send_message_safe(bot, db, admin.user_id, message):
                 logger.info(f"✅ Уведомление отправлено админу {admin.user_id}")
-            except Exception as e:
-                error_msg = str(e).lower()
-                if "blocked" in error_msg or "chat not found" in error_msg:
-                    logger.warning(f"Админ {admin.user_id} заблокировал бота")
-                else:
-                    logger.exception(f"Ошибка отправки уведомления админу {admin.user_id}: {e}")
     except Exception as e:
         logger.exception(f"Ошибка при отправке уведомлений админам: {e}")
 
@@ -82,14 +78,9 @@ async def notify_admins_error(bot: Bot, db: PostgresHandler, error_details: str)
         )
 
         for admin in admins:
-            try:
-                await bot.send_message(admin.user_id, message)
+            if not admin.user.is_deliverable:
+                continue
+            if await send_message_safe(bot, db, admin.user_id, message):
                 logger.info(f"✅ Уведомление об ошибке отправлено админу {admin.user_id}")
-            except Exception as e:
-                error_msg = str(e).lower()
-                if "blocked" in error_msg or "chat not found" in error_msg:
-                    logger.warning(f"Админ {admin.user_id} заблокировал бота")
-                else:
-                    logger.exception(f"Ошибка отправки уведомления админу {admin.user_id}: {e}")
     except Exception as e:
         logger.exception(f"Ошибка при отправке уведомлений админам: {e}")
@@ -1,10 +1,21 @@
-from datetime import datetime, timedelta
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from aiogram import Bot
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.deep_linking import create_start_link
 import logging
 
 from db_handler import PostgresHandler
-from keyboards.birthday_keyboards import get_birthday_actions_keyboard
+from db_handler.models import Collector, User
+from keyboards.birthday_keyboards import (
+    GIFT_LINK_PREFIX,
+    get_birthday_actions_keyboard,
+    get_birthday_digest_keyboard,
+)
 from config import get_settings
+from utils.broadcast import Broadcaster
+from utils.delivery import log_delivery_error, undeliverable_reason
 
 logger = logging.getLogger(__name__)
 
@@ -21,135 +32,405 @@ BIRTHDAY_NOTIFICATION_WEEK = (
     "{payment_block}"
 )
 
+BIRTHDAY_DIGEST_SECTION = "📅 {when}, <b>{date}</b>:"
+
 LOG_NO_BIRTHDAYS = "Нет дней рождения {when}"
 LOG_REMINDERS_SENT = "Отправлены напоминания о {count} днях рождения ({when})"
-LOG_NO_RECIPIENTS = "Нет получателей для отправки сообщений"
+LOG_DIGEST_SENT = "Отправлен дайджест о {count} днях рождения"
+LOG_ANNOUNCED = "Напоминания опубликованы в чате {chat_id}, коллекторам: {collectors}"
+
+
+@dataclass(frozen=True, slots=True)
+class BirthdayReminder:
+    """Напоминание об одном имениннике, подготовленное для всех получателей."""
+
+    birthday_user_id: int  # Для дайджеста — ближайший именинник
+    text: str
+    collector_text: str  # С возрастом именинника — для коллекторов
+    keyboard: InlineKeyboardMarkup
+    expires_on: date  # Когда сообщение удаляется из чатов
+
+
+def _render_payment_block(active_collector: Collector | None) -> str:
+    """Блок реквизитов (для всех получателей)."""
+    if active_collector:
+        collector_user = active_collector.user
+        return (
+            "Перевести деньги на подарок 🎁:\n"
+            f"Кому: {collector_user.initials}\n"
+            f"Куда: <b>{active_collector.bank_name or 'не указан банк'}</b>, "
+            f"{active_collector.phone_number}\n"
+        )
+    return (
+        "Перевести деньги на подарок 🎁:\n"
+        "Ответственный за сбор пока не назначен.\n"
+    )
+
+
+def _get_when_text(days_before: int) -> str:
+    if days_before == 1:
+        return "Завтра"
+    if days_before == 7:
+        return "Через неделю"
+    return f"Через {days_before} дн."
+
+
+def _render_age(birthday_user: User, target_date: datetime) -> str:
+    """Информация о возрасте именинника (показывается коллекторам)."""
+    age = target_date.year - birthday_user.birth_date.year
+    if age <= 0:
+        return ""
+    if age % 10 == 0:
+        return f"\n\n<b>🎊 Юбилей - {age} лет!</b>\n"
+    return f"\n\nИсполняется: <b>{age} лет</b>\n"
+
+
+def _render_reminder(
+    birthday_user: User,
+    target_date: datetime,
+    days_before: int,
+    payment_block: str,
+    gift_links: dict[int, str] | None = None,
+) -> BirthdayReminder:
+    """Подготовить оба варианта напоминания об имениннике.
+
+    С gift_links кнопка подарка — ссылка на бота (для сообщения в группе).
+    """
+    # Выбираем шаблон в зависимости от days_before
+    template = (
+        BIRTHDAY_NOTIFICATION_TOMORROW
+        if days_before == 1
+        else BIRTHDAY_NOTIFICATION_WEEK
+    )
+    text = template.format(
+        date=target_date.strftime("%d.%m"),
+        full_name=birthday_user.full_name,
+        payment_block=payment_block,
+    )
+
+    # Коллекторам добавляем информацию о возрасте
+    age_info = _render_age(birthday_user, target_date)
+    collector_text = text.rstrip() + age_info if age_info else text
+
+    return BirthdayReminder(
+        birthday_user_id=birthday_user.user_id,
+        text=text,
+        collector_text=collector_text,
+        keyboard=get_birthday_actions_keyboard(birthday_user.user_id, gift_links),
+        expires_on=target_date.date() + timedelta(days=1),
+    )
+
+
+def _render_digest(
+    sections: list[tuple[int, datetime, list[User]]],
+    payment_block: str,
+    exclude_user_id: int | None = None,
+    gift_links: dict[int, str] | None = None,
+) -> BirthdayReminder | None:
+    """
+    Подготовить дайджест: все дни рождения разделов в одном сообщении.
+
+    Args:
+        sections: [(days_before, дата ДР, именинники)] в порядке дат
+        exclude_user_id: Именинник-получатель, которого не нужно упоминать
+        gift_links: {user_id: ссылка на бота} — для сообщения в группе
+
+    Returns:
+        None, если кроме exclude_user_id упоминать некого
+    """
+    lines = ["Доброе утро!\n"]
+    collector_lines = ["Доброе утро!\n"]
+    mentioned: list[tuple[User, datetime]] = []
+
+    for days_before, target_date, users in sections:
+        users = [user for user in users if user.user_id != exclude_user_id]
+        if not users:
+            continue
+
+        header = BIRTHDAY_DIGEST_SECTION.format(
+            when=_get_when_text(days_before), date=target_date.strftime("%d.%m")
+        )
+        lines.append(header)
+        collector_lines.append(header)
+        for user in users:
+            line = f"• <b>{user.full_name}</b>"
+            lines.append(line)
+            # Коллекторам добавляем информацию о возрасте
+            age_info = _render_age(user, target_date).strip()
+            collector_lines.append(f"{line}, {age_info}" if age_info else line)
+            mentioned.append((user, target_date))
+        lines.append("")
+        collector_lines.append("")
+
+    if not mentioned:
+        return None
+
+    first_user, first_date = mentioned[0]
+    return BirthdayReminder(
+        birthday_user_id=first_user.user_id,
+        text="\n".join(lines) + "\n" + payment_block,
+        collector_text="\n".join(collector_lines) + "\n" + payment_block,
+        keyboard=get_birthday_digest_keyboard(
+            [(user.user_id, user.initials) for user, _ in mentioned], gift_links
+        ),
+        # Ближайшие дни рождения попадут в следующий дайджест
+        expires_on=first_date.date() + timedelta(days=1),
+    )
+
+
+async def _get_payment_block(db: PostgresHandler) -> str:
+    # Получаем активного коллектора один раз для всех уведомлений
+    active_collector = None
+    try:
+        active_collector = await db.get_active_collector()
+    except Exception as e:
+        logger.warning(f"Не удалось получить активного коллектора: {e}")
+    return _render_payment_block(active_collector)
+
+
+async def _get_gift_links(bot: Bot, birthday_users: list[User]) -> dict[int, str]:
+    """Ссылки на бота для предложения подарка: t.me/<бот>?start=gift_<id>."""
+    return {
+        user.user_id: await create_start_link(
+            bot, f"{GIFT_LINK_PREFIX}{user.user_id}"
+        )
+        for user in birthday_users
+    }
+
+
+async def _announce(
+    bot: Bot, chat_id: int, reminders: list[BirthdayReminder]
+) -> None:
+    """
+    Опубликовать напоминания в общем чате.
+
+    Сообщения в группе не попадают в reminder_messages и не удаляются:
+    кнопки в них ведут в личный чат с ботом и остаются рабочими.
+    """
+    for reminder in reminders:
+        try:
+            await bot.send_message(
+                chat_id, reminder.text, reply_markup=reminder.keyboard
+            )
+        except Exception as e:
+            logger.exception(f"Ошибка публикации напоминания в чате {chat_id}: {e}")
+
+
+async def _send_reminders(
+    bot: Bot,
+    db: PostgresHandler,
+    collector_ids: set[int],
+    reminders_for: Callable[[int], list[BirthdayReminder]],
+    recipients: Iterable[int] | None = None,
+) -> None:
+    """
+    Отправить каждому получателю его напоминания.
+
+    Получатели (по умолчанию — все пользователи) читаются из БД пачками ID
+    и обрабатываются параллельно в рамках общего лимита запросов бота.
+    Отправленные напоминания сохраняются после каждой пачки.
+
+    Args:
+        reminders_for: Напоминания для получателя по его ID
+        recipients: ID получателей, если отправлять не всем
+    """
+    # Отправленные напоминания, удаляются на следующий день после ДР
+    sent_reminders: list[dict] = []
+    undeliverable: dict[int, str] = {}
+
+    async def notify(chat_id: int) -> None:
+        is_collector = chat_id in collector_ids
+        errors: list[Exception] = []
+        for reminder in reminders_for(chat_id):
+            try:
+                sent = await bot.send_message(
+                    chat_id,
+                    reminder.collector_text if is_collector else reminder.text,
+                    reply_markup=reminder.keyboard,
+                )
+            except Exception as e:
+                # Ошибка одного напоминания не отменяет остальные
+                errors.append(e)
+                reason = undeliverable_reason(e)
+                if reason is not None:
+                    # Чат недоступен — остальные напоминания тоже не дойдут
+                    undeliverable[chat_id] = reason
+                    break
+                continue
+            sent_reminders.append(
+                {
+                    "chat_id": chat_id,
+                    "message_id": sent.message_id,
+                    "birthday_user_id": reminder.birthday_user_id,
+                    "sent_at": datetime.now(),
+                    "expires_on": reminder.expires_on,
+                }
+            )
+
+        if errors:
+            for error in errors[:-1]:
+                log_delivery_error(chat_id, error)
+            # Чат учитывается в ошибках рассылки
+            raise errors[-1]
+
+    async def flush() -> None:
+        nonlocal sent_reminders, undeliverable
+        batch, sent_reminders = sent_reminders, []
+        statuses, undeliverable = undeliverable, {}
+        try:
+            await db.set_delivery_statuses(statuses)
+            # Напоминания удаляются из чатов после дня рождения (delete_expired_reminders)
+            await db.reminders.add_many(batch)
+        except Exception as e:
+            logger.exception(f"Ошибка сохранения отправленных напоминаний: {e}")
+
+    async def chunks() -> AsyncIterator[list[int]]:
+        # Следующая пачка запрашивается, когда обработана предыдущая:
+        # в этот момент сохраняем её результаты
+        if recipients is None:
+            async for chunk in db.users.iter_ids():
+                yield chunk
+                await flush()
+        else:
+            yield list(recipients)
+            await flush()
+
+    await Broadcaster().run(chunks(), notify)
 
 
 async def send_birthday_notifications(
     bot: Bot, days_before: int, db: PostgresHandler
 ) -> None:
-    """Отправляет напоминания о предстоящих днях рождения за days_before дней."""
+    """
+    Отправляет напоминания о предстоящих днях рождения за days_before дней.
+
+    С ANNOUNCEMENT_CHAT_ID напоминание публикуется один раз в общем чате,
+    а в личные сообщения приходит только коллекторам.
+    """
+    settings = get_settings()
     today = datetime.now()
     target_date = today + timedelta(days=days_before)
     when_text = "Через неделю" if days_before == 7 else "Завтра"
 
     try:
-        with_transfers = days_before == 1
-        all_users = await db.get_all_users(with_transfers=with_transfers)
-        if not all_users:
-            logger.warning(LOG_NO_RECIPIENTS)
+        # Именинники выбираются в БД; получатели ниже читаются пачками ID
+        birthday_users = await db.users.get_by_birthday(
+            target_date.month, target_date.day, year=target_date.year
+        )
+        if not birthday_users:
+            logger.info(LOG_NO_BIRTHDAYS.format(when=when_text))
             return
+        # Коллекторам дополнительно показывается возраст именинника
+        collector_ids = set(await db.users.get_collector_ids())
     except Exception as e:
         logger.exception(f"Ошибка получения пользователей для напоминаний: {e}")
         return
 
-    birthday_users = [
-        user
-        for user in all_users
-        if user.birth_date
-        and user.birth_date.month == target_date.month
-        and user.birth_date.day == target_date.day
+    # Тексты и клавиатуры готовятся один раз на именинника,
+    # а не для каждого получателя
+    payment_block = await _get_payment_block(db)
+    reminders = [
+        _render_reminder(birthday_user, target_date, days_before, payment_block)
+        for birthday_user in birthday_users
     ]
 
-    if not birthday_users:
-        logger.info(LOG_NO_BIRTHDAYS.format(when=when_text))
-        return
+    def reminders_for(chat_id: int) -> list[BirthdayReminder]:
+        return [
+            reminder for reminder in reminders if reminder.birthday_user_id != chat_id
+        ]
 
-    # Получаем активного коллектора один раз для всех уведомлений
-    active_collector = None
-    try:
-        active_collector = await db.get_active_collector()
-    except Exception as e:
-        logger.warning(f"Не удалось получить активного коллектора: {e}")
+    if settings.announcement_chat_id is None:
+        await _send_reminders(bot, db, collector_ids, reminders_for)
+    else:
+        # Одно сообщение в группу, в личку — только коллекторам (с возрастом)
+        gift_links = await _get_gift_links(bot, birthday_users)
+        await _announce(
+            bot,
+            settings.announcement_chat_id,
+            [
+                _render_reminder(
+                    birthday_user, target_date, days_before, payment_block, gift_links
+                )
+                for birthday_user in birthday_users
+            ],
+        )
+        await _send_reminders(
+            bot, db, collector_ids, reminders_for, recipients=collector_ids
+        )
+        logger.info(
+            LOG_ANNOUNCED.format(
+                chat_id=settings.announcement_chat_id, collectors=len(collector_ids)
+            )
+        )
 
-    for birthday_user in birthday_users:
-        # Безопасное формирование полного имени
-        name_parts = [
-            birthday_user.last_name or "",
-            birthday_user.first_name or "",
-            birthday_user.patronymic or "",
-        ]
-        full_name = " ".join(filter(None, name_parts)).strip()
-        if not full_name:
-            full_name = f"Пользователь {birthday_user.user_id}"
+    logger.info(LOG_REMINDERS_SENT.format(count=len(birthday_users), when=when_text))
 
-        for recipient in all_users:
-            if recipient == birthday_user:
-                continue
 
-            show_keyboard = True
-
-            # Если получатель - коллектор, добавляем информацию о возрасте
-            age_info = ""
-            if recipient.collector and birthday_user.birth_date:
-                try:
-                    birth_year = birthday_user.birth_date.year
-                    age = target_date.year - birth_year
-                    if age > 0:
-                        if age % 10 == 0:
-                            age_info = f"\n\n<b>🎊 Юбилей - {age} лет!</b>\n"
-                        else:
-                            age_info = f"\n\nИсполняется: <b>{age} лет</b>\n"
-                except Exception as e:
-                    logger.warning(
-                        f"Ошибка вычисления возраста для {birthday_user.user_id}: {e}"
-                    )
-
-            # Блок реквизитов (для всех получателей)
-            if active_collector:
-                collector_user = active_collector.user
-                payment_block = (
-                    "Перевести деньги на подарок 🎁:\n"
-                    f"Кому: {collector_user.initials}\n"
-                    f"Куда: <b>{active_collector.bank_name or 'не указан банк'}</b>, "
-                    f"{active_collector.phone_number}\n"
-                )
-            else:
-                payment_block = (
-                    "Перевести деньги на подарок 🎁:\n"
-                    "Ответственный за сбор пока не назначен.\n"
-                )
+async def send_birthday_digest(
+    bot: Bot, db: PostgresHandler, days: tuple[int, ...] = (1, 7)
+) -> None:
+    """
+    Отправляет каждому получателю один дайджест со всеми днями рождения
+    через days дней (по умолчанию — завтра и через неделю).
 
-            # Выбираем шаблон в зависимости от days_before
-            if days_before == 1:
-                message = BIRTHDAY_NOTIFICATION_TOMORROW.format(
-                    date=target_date.strftime("%d.%m"),
-                    full_name=full_name,
-                    payment_block=payment_block,
-                )
-            else:
-                message = BIRTHDAY_NOTIFICATION_WEEK.format(
-                    date=target_date.strftime("%d.%m"),
-                    full_name=full_name,
-                    payment_block=payment_block,
-                )
+    Вместо отдельного сообщения на каждого именинника — одно сообщение
+    с кнопкой предложения подарка для каждого. С ANNOUNCEMENT_CHAT_ID
+    дайджест публикуется в общем чате, в личку — только коллекторам.
+    """
+    settings = get_settings()
+    today = datetime.now()
+    sections: list[tuple[int, datetime, list[User]]] = []
 
-            # Добавляем информацию о возрасте для коллекторов
-            if age_info:
-                message = message.rstrip() + age_info
-            keyboard = (
-                get_birthday_actions_keyboard(birthday_user.user_id)
-                if show_keyboard
-                else None
+    try:
+        for days_before in sorted(days):
+            target_date = today + timedelta(days=days_before)
+            birthday_users = await db.users.get_by_birthday(
+                target_date.month, target_date.day, year=target_date.year
             )
+            if birthday_users:
+                sections.append((days_before, target_date, birthday_users))
+        if not sections:
+            logger.info(LOG_NO_BIRTHDAYS.format(when="для дайджеста"))
+            return
+        # Коллекторам дополнительно показывается возраст именинника
+        collector_ids = set(await db.users.get_collector_ids())
+    except Exception as e:
+        logger.exception(f"Ошибка получения пользователей для дайджеста: {e}")
+        return
 
-            try:
-                await bot.send_message(
-                    recipient.user_id, message, reply_markup=keyboard
-                )
-            except Exception as e:
-                # Обработка различных типов ошибок
-                error_msg = str(e).lower()
-                if "blocked" in error_msg or "chat not found" in error_msg:
-                    logger.warning(
-                        f"Пользователь {recipient.user_id} заблокировал бота или чат не найден"
-                    )
-                elif "forbidden" in error_msg:
-                    logger.warning(f"Нет доступа к пользователю {recipient.user_id}")
-                else:
-                    logger.exception(
-                        f"Ошибка отправки напоминания о ДР пользователю {recipient.user_id}: {e}"
-                    )
+    # Общий дайджест готовится один раз; именинникам — свой, без них самих
+    payment_block = await _get_payment_block(db)
+    digest = _render_digest(sections, payment_block)
+    birthday_ids = {user.user_id for _, _, users in sections for user in users}
+    personal: dict[int, BirthdayReminder | None] = {}
 
-    logger.info(LOG_REMINDERS_SENT.format(count=len(birthday_users), when=when_text))
+    def digest_for(chat_id: int) -> list[BirthdayReminder]:
+        if chat_id not in birthday_ids:
+            return [digest]
+        if chat_id not in personal:
+            personal[chat_id] = _render_digest(
+                sections, payment_block, exclude_user_id=chat_id
+            )
+        reminder = personal[chat_id]
+        return [reminder] if reminder else []
+
+    if settings.announcement_chat_id is None:
+        await _send_reminders(bot, db, collector_ids, digest_for)
+    else:
+        birthday_users = [user for _, _, users in sections for user in users]
+        gift_links = await _get_gift_links(bot, birthday_users)
+        await _announce(
+            bot,
+            settings.announcement_chat_id,
+            [_render_digest(sections, payment_block, gift_links=gift_links)],
+        )
+        await _send_reminders(
+            bot, db, collector_ids, digest_for, recipients=collector_ids
+        )
+        logger.info(
+            LOG_ANNOUNCED.format(
+                chat_id=settings.announcement_chat_id, collectors=len(collector_ids)
+            )
+        )
+
+    logger.info(LOG_DIGEST_SENT.format(count=len(birthday_ids)))
@@ -0,0 +1,123 @@
+"""
+Удаление напоминаний о днях рождения, которые уже прошли.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.methods import DeleteMessages, EditMessageReplyMarkup
+
+from db_handler import PostgresHandler
+from utils.broadcast import Broadcaster
+from utils.delivery import log_delivery_error
+
+logger = logging.getLogger(__name__)
+
+# Bot API deleteMessages принимает до 100 сообщений одного чата
+DELETE_MESSAGES_LIMIT = 100
+# Бот может удалять свои сообщения в течение 48 часов (берём с запасом)
+DELETE_MESSAGES_MAX_AGE = timedelta(hours=47)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """
+    Повтор запроса не поможет: сообщение уже удалено или без кнопок,
+    чат не найден, бот заблокирован. Иначе (сеть, 429, ошибка сервера)
+    напоминание обрабатывается снова при следующем запуске.
+    """
+    return isinstance(error, (TelegramBadRequest, TelegramForbiddenError))
+
+
+async def delete_expired_reminders(bot: Bot, db: PostgresHandler) -> None:
+    """
+    Удалить из чатов истёкшие напоминания (вместе с кнопками подарка).
+
+    Сообщения младше 48 часов удаляются запросом deleteMessages — по одному
+    запросу на каждые 100 сообщений чата. Более старые удалить нельзя,
+    у них убирается клавиатура (editMessageReplyMarkup), чтобы кнопки
+    подарка прошедшего дня рождения больше не нажимались.
+
+    Записи удаляются только для обработанных сообщений: после временной
+    ошибки напоминание остаётся в reminder_messages до следующего запуска.
+    """
+    today = date.today()
+    deletable_since = datetime.now() - DELETE_MESSAGES_MAX_AGE
+
+    try:
+        expired = await db.reminders.get_expired(today)
+    except Exception as e:
+        logger.exception(f"Ошибка получения истёкших напоминаний: {e}")
+        return
+
+    if not expired:
+        logger.info("Нет истёкших напоминаний")
+        return
+
+    edited = 0
+    # ID записей напоминаний, которые удалены из чата (или удалять нечего)
+    processed: list[int] = []
+
+    async def delete_chat_reminders(chat_id: int) -> None:
+        nonlocal edited
+        reminders = expired[chat_id]
+        recent = [
+            (record_id, message_id)
+            for record_id, message_id, sent_at in reminders
+            if sent_at >= deletable_since
+        ]
+        errors: list[Exception] = []
+
+        for start in range(0, len(recent), DELETE_MESSAGES_LIMIT):
+            chunk = recent[start : start + DELETE_MESSAGES_LIMIT]
+            try:
+                await bot(
+                    DeleteMessages(
+                        chat_id=chat_id,
+                        message_ids=[message_id for _, message_id in chunk],
+                    )
+                )
+            except Exception as e:
+                if not _is_permanent(e):
+                    errors.append(e)
+                    continue
+                logger.debug(f"Не удалось удалить напоминания в чате {chat_id}: {e}")
+            processed.extend(record_id for record_id, _ in chunk)
+
+        for record_id, message_id, sent_at in reminders:
+            if sent_at >= deletable_since:
+                continue
+            try:
+                await bot(
+                    EditMessageReplyMarkup(
+                        chat_id=chat_id, message_id=message_id, reply_markup=None
+                    )
+                )
+                edited += 1
+            except Exception as e:
+                if not _is_permanent(e):
+                    errors.append(e)
+                    continue
+                # Сообщение удалено пользователем или уже без кнопок
+                logger.debug(f"Не удалось убрать кнопки в чате {chat_id}: {e}")
+            processed.append(record_id)
+
+        if errors:
+            for error in errors[:-1]:
+                log_delivery_error(chat_id, error)
+            # Чат учитывается в ошибках
+            raise errors[-1]
+
+    stats = await Broadcaster().run(expired, delete_chat_reminders)
+    try:
+        await db.reminders.delete_many(processed)
+    except Exception as e:
+        logger.exception(f"Ошибка удаления записей напоминаний: {e}")
+
+    total = sum(map(len, expired.values()))
+    logger.info(
+        f"Обработаны напоминания: {len(processed)} из {total} сообщений "
+        f"в {stats.sent} чатах (без кнопок оставлено: {edited}), "
+        f"ошибок: {stats.failed}, остальные — при следующем запуске"
+    )
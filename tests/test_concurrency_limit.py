@@ -0,0 +1,84 @@
+"""
+Отсечение апдейтов ConcurrencyLimitMiddleware при перегрузке.
+
+В обработке одновременно не больше UPDATES_CONCURRENCY апдейтов
+(tasks_concurrency_limit в start_polling), поэтому очередь хендлеров
+должна заполняться раньше — иначе ответ "бот перегружен" не отправится.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from pydantic import ValidationError
+
+from config import Settings
+from middlewares.concurrency import MSG_BUSY, ConcurrencyLimitMiddleware
+
+REQUIRED_ENV = {
+    "TOKEN": "42:TEST",
+    "DB_USER": "user",
+    "DB_PASSWORD": "password",
+    "DB_NAME": "test",
+    "DEFAULT_SERVICE_USER_ID": 1,
+    "ADMIN_SECRET_CODE": "admin",
+    "SERVICE_SECRET_CODE": "service",
+}
+
+
+def _settings(**values) -> Settings:
+    return Settings(_env_file=None, **(REQUIRED_ENV | values))
+
+
+def _update(update_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        update_id=update_id,
+        message=SimpleNamespace(answer=AsyncMock()),
+        callback_query=None,
+    )
+
+
+async def _feed(settings: Settings, updates: list) -> ConcurrencyLimitMiddleware:
+    """Обработать апдейты, как start_polling с tasks_concurrency_limit."""
+    middleware = ConcurrencyLimitMiddleware(
+        limit=settings.handlers_concurrency, queue_size=settings.handlers_queue_size
+    )
+    polling = asyncio.Semaphore(settings.updates_concurrency)
+    release = asyncio.Event()
+
+    async def handler(event, data) -> None:
+        await release.wait()
+
+    async def process(update) -> None:
+        async with polling:
+            await middleware(handler, update, {})
+
+    tasks = [asyncio.create_task(process(update)) for update in updates]
+    # Хендлеры держат пул, пока остальные апдейты доходят до middleware
+    await asyncio.sleep(0.1)
+    release.set()
+    await asyncio.gather(*tasks)
+    return middleware
+
+
+def test_default_settings_shed_overload():
+    settings = _settings()
+    updates = [_update(i) for i in range(300)]
+
+    middleware = asyncio.run(_feed(settings, updates))
+
+    accepted = settings.handlers_concurrency + settings.handlers_queue_size
+    assert middleware.processed == accepted
+    assert middleware.shed == len(updates) - accepted
+    busy = [u for u in updates if u.message.answer.await_count]
+    assert len(busy) == middleware.shed
+    busy[0].message.answer.assert_awaited_once_with(MSG_BUSY)
+
+
+def test_queue_must_fill_before_updates_pool():
+    with pytest.raises(ValidationError, match="HANDLERS_QUEUE_SIZE"):
+        _settings(
+            UPDATES_CONCURRENCY=100, HANDLERS_CONCURRENCY=10, HANDLERS_QUEUE_SIZE=90
+        )
+    _settings(UPDATES_CONCURRENCY=100, HANDLERS_CONCURRENCY=10, HANDLERS_QUEUE_SIZE=89)
@@ -0,0 +1,124 @@
+"""
+DispatchIndex выбирает тот же хендлер, что и обычный trigger.
+
+Проверяется на всех роутерах бота: для каждого значения TextEquals /
+DataEquals (и значения, которого нет в индексе) в каждом состоянии FSM
+первый подходящий хендлер из candidates() должен совпадать с первым
+подходящим хендлером из observer.handlers.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+
+from aiogram import Bot, Router
+from aiogram.fsm.state import StatesGroup
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+REQUIRED_ENV = {
+    "TOKEN": "42:TEST",
+    "DB_USER": "user",
+    "DB_PASSWORD": "password",
+    "DB_NAME": "test",
+    "DEFAULT_SERVICE_USER_ID": "1",
+    "ADMIN_SECRET_CODE": "admin",
+    "SERVICE_SECRET_CODE": "service",
+}
+
+# Значение, которого нет ни в одном фильтре
+UNKNOWN_VALUE = "нет такой кнопки"
+
+USER = User(id=1, is_bot=False, first_name="Тест")
+CHAT = Chat(id=1, type="private")
+
+
+def _routers() -> list[Router]:
+    # handlers.register читает настройки при импорте
+    for key, value in REQUIRED_ENV.items():
+        os.environ.setdefault(key, value)
+
+    from handlers.admin_handler import admin_router
+    from handlers.birthday_handler import birthday_router
+    from handlers.collector_handler import collector_router
+    from handlers.main_menu import main_menu_router
+    from handlers.register import register_router
+    from handlers.service_user_handler import service_user_router
+    from handlers.set_role_handler import role_router
+    from handlers.start import start_router
+    from handlers.wish_handler import wishlist_router
+
+    return [
+        start_router,
+        main_menu_router,
+        register_router,
+        wishlist_router,
+        birthday_router,
+        admin_router,
+        collector_router,
+        service_user_router,
+        role_router,
+    ]
+
+
+def _states() -> list[str | None]:
+    from states import user_states
+
+    states: list[str | None] = [None]
+    for group in vars(user_states).values():
+        if isinstance(group, type) and issubclass(group, StatesGroup):
+            states.extend(group.__state_names__)
+    return states
+
+
+def _event(event_type: str, value: str, bot: Bot) -> Message | CallbackQuery:
+    message = Message(
+        message_id=1, date=datetime.now(), chat=CHAT, from_user=USER, text=value
+    )
+    if event_type == "message":
+        return message.as_(bot)
+    return CallbackQuery(
+        id="1", from_user=USER, chat_instance="1", message=message, data=value
+    ).as_(bot)
+
+
+async def _first(handlers, event, **kwargs):
+    for handler in handlers:
+        result, _ = await handler.check(event, handler=handler, **kwargs)
+        if result:
+            return handler.callback
+    return None
+
+
+async def _compare() -> int:
+    from utils.dispatch_index import INDEXED_FILTERS, DispatchIndex, _exact_value
+
+    bot = Bot("42:TEST")
+    states = _states()
+    checked = 0
+
+    for router in _routers():
+        for event_type, filter_type in INDEXED_FILTERS.items():
+            observer = router.observers[event_type]
+            index = DispatchIndex(observer, filter_type)
+            index.build()
+
+            values = {_exact_value(h, filter_type) for h in observer.handlers}
+            values = {v for v in values if isinstance(v, str)} | {UNKNOWN_VALUE}
+
+            for value in sorted(values):
+                event = _event(event_type, value, bot)
+                for raw_state in states:
+                    kwargs = {"bot": bot, "raw_state": raw_state}
+                    linear = await _first(observer.handlers, event, **kwargs)
+                    indexed = await _first(index.candidates(event), event, **kwargs)
+                    assert indexed is linear, (router, event_type, value, raw_state)
+                    checked += 1
+
+    await bot.session.close()
+    return checked
+
+
+def test_index_matches_linear_dispatch():
+    checked = asyncio.run(_compare())
+    # Проверены значения из индекса, а не только UNKNOWN_VALUE
+    assert checked > 2 * 9 * len(_states())
@@ -0,0 +1,74 @@
+"""
+Общий лимит RequestLimiterMiddleware после паузы 429 и при отмене запросов.
+"""
+
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from middlewares.request_limiter import RequestLimiterMiddleware
+
+GLOBAL_LIMIT = (50, 5)
+WINDOW = 0.5
+
+
+def _limiter() -> RequestLimiterMiddleware:
+    return RequestLimiterMiddleware(
+        global_limit=GLOBAL_LIMIT,
+        limits={"send": (1000, 1000)},
+        chat_limit=(5, 1),
+    )
+
+
+async def _send_all(
+    limiter, chat_ids: list[int], retry_after_chat: int | None = None
+) -> list[float]:
+    """Отправить по запросу в каждый чат; первый запрос в retry_after_chat — 429."""
+    sent: list[float] = []
+    flood = {retry_after_chat}
+
+    async def make_request(bot, method):
+        if method.chat_id in flood:
+            flood.clear()
+            raise TelegramRetryAfter(method=method, message="Flood", retry_after=1)
+        sent.append(time.monotonic())
+        return True
+
+    await asyncio.gather(
+        *(
+            limiter(make_request, None, SendMessage(chat_id=chat_id, text="Текст"))
+            for chat_id in chat_ids
+        )
+    )
+    return sorted(sent)
+
+
+def test_requests_after_pause_do_not_exceed_global_limit():
+    # 429 приостанавливает класс "send": все запросы ждут конца паузы
+    sent = asyncio.run(_send_all(_limiter(), list(range(1, 61)), retry_after_chat=1))
+
+    assert len(sent) == 60
+    rate, burst = GLOBAL_LIMIT
+    allowed = burst + rate * WINDOW + 1
+    for i, started in enumerate(sent):
+        in_window = sum(1 for t in sent[i:] if t < started + WINDOW)
+        assert in_window <= allowed, f"{in_window} запросов за {WINDOW} с"
+
+
+def test_cancelled_waiters_return_tokens():
+    async def scenario() -> float:
+        limiter = _limiter()
+        chat_ids = list(range(1, 41))
+        waiters = asyncio.ensure_future(_send_all(limiter, chat_ids))
+        await asyncio.sleep(0.05)
+        waiters.cancel()
+        await asyncio.gather(waiters, return_exceptions=True)
+
+        started = time.monotonic()
+        await _send_all(limiter, [100])
+        return time.monotonic() - started
+
+    # Без возврата токенов новый запрос ждал бы очередь отменённых (~0.6 с)
+    assert asyncio.run(scenario()) < 0.1
@@ -0,0 +1,147 @@
+"""
+Рассылка сообщений множеству пользователей.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    Iterator,
+)
+from dataclasses import dataclass, field
+from typing import Any
+
+from utils.delivery import log_delivery_error
+
+logger = logging.getLogger(__name__)
+
+# Запросы ждут лимита в RequestLimiterMiddleware, воркеров нужно
+# столько, чтобы лимит ~30 сообщений в секунду был выбран полностью
+WORKERS = 30
+
+# Ссылки на фоновые задачи, чтобы их не собрал сборщик мусора
+_background_tasks: set[asyncio.Task] = set()
+
+
+@dataclass
+class BroadcastStats:
+    """Итоги рассылки."""
+
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        """Длительность рассылки в секундах."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def done(self) -> int:
+        """Обработано чатов."""
+        return self.sent + self.failed
+
+    @property
+    def rate(self) -> float:
+        """Обработано чатов в секунду."""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Оценка оставшегося времени в секундах (None, пока нет данных)."""
+        rate = self.rate
+        return (self.total - self.done) / rate if rate else None
+
+
+class Broadcaster:
+    """
+    Конкурентная обработка множества чатов пулом воркеров.
+
+    Каждый чат обрабатывается функцией job(chat_id), которая выполняет
+    запросы к Bot API напрямую: лимиты Telegram (общий и на чат) и
+    повторы при TelegramRetryAfter обеспечивает RequestLimiterMiddleware
+    сессии бота, общий для рассылок и остальных запросов.
+
+    Использование:
+
+        async def job(chat_id: int) -> None:
+            await bot(SendMessage(chat_id=chat_id, text=text))
+
+        stats = await Broadcaster().run(user_ids, job)
+    """
+
+    def __init__(self, workers: int = WORKERS) -> None:
+        self.workers = workers
+
+    async def run(
+        self,
+        chat_ids: Iterable[int] | AsyncIterable[list[int]],
+        job: Callable[[int], Awaitable[Any]],
+        stats: BroadcastStats | None = None,
+    ) -> BroadcastStats:
+        """
+        Выполнить job для каждого чата.
+
+        chat_ids — список чатов или асинхронный итератор пачек чатов
+        (например, UserRepository.iter_ids): следующая пачка читается,
+        когда обработана предыдущая, поэтому в памяти находится не больше
+        одной пачки. Для пачек stats.total задаётся вызывающим кодом.
+
+        Ошибка job для одного чата не прерывает рассылку, а учитывается
+        в stats.failed. Переданный stats обновляется по ходу рассылки
+        (например, для отображения прогресса).
+        """
+        if stats is None:
+            stats = BroadcastStats()
+        if isinstance(chat_ids, AsyncIterable):
+            chunks = chat_ids
+        else:
+            chat_ids = list(chat_ids)
+            stats.total = len(chat_ids)
+            chunks = _single_chunk(chat_ids)
+
+        async def worker(queue: Iterator[int]) -> None:
+            for chat_id in queue:
+                try:
+                    await job(chat_id)
+                    stats.sent += 1
+                except Exception as e:
+                    stats.failed += 1
+                    log_delivery_error(chat_id, e)
+
+        async for chunk in chunks:
+            queue = iter(chunk)
+            await asyncio.gather(
+                *(worker(queue) for _ in range(min(self.workers, len(chunk))))
+            )
+
+        stats.finished_at = time.monotonic()
+        # Число чатов в пачках заранее может быть неизвестно
+        stats.total = max(stats.total, stats.done)
+        logger.info(
+            f"Рассылка завершена: {stats.sent}/{stats.total} за {stats.elapsed:.1f} с "
+            f"({stats.rate:.1f} чатов/с), ошибок: {stats.failed}"
+        )
+        return stats
+
+
+async def _single_chunk(chat_ids: list[int]) -> AsyncIterator[list[int]]:
+    yield chat_ids
+
+
+def run_in_background(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Запустить корутину в фоне, сохранив ссылку на задачу."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
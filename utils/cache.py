@@ -0,0 +1,121 @@
+"""
+Простые in-memory кэши процесса.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Ограниченный LRU-кэш с временем жизни записей.
+
+    Все операции O(1). При переполнении вытесняется самая давно
+    использованная запись, устаревшие записи удаляются при обращении.
+
+    Чтобы значение, прочитанное из БД до инвалидации, не попало в кэш
+    после неё, запись через set() принимает version — значение
+    self.version на момент начала загрузки. Если с тех пор была
+    инвалидация, запись игнорируется.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        """Получить значение или default, если записи нет или она устарела."""
+        item = self._data.get(key, MISSING)
+        if item is MISSING:
+            self.misses += 1
+            return default
+
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, version: int | None = None) -> None:
+        """Сохранить значение (если не было инвалидации после version)."""
+        if version is not None and version != self.version:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """Удалить запись по ключу."""
+        self.version += 1
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очистить кэш полностью."""
+        self.version += 1
+        self._data.clear()
+
+    def __contains__(self, key: K) -> bool:
+        item = self._data.get(key)
+        return item is not None and item[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики попаданий/промахов и текущий размер."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+class ValueCache(Generic[V]):
+    """
+    Кэш одного значения с явной инвалидацией (без TTL).
+
+    Значение None тоже кэшируется, поэтому отсутствие записи
+    обозначается MISSING.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._value: V | Any = MISSING
+
+    def get(self, default: Any = MISSING) -> V | Any:
+        """Получить значение или default, если оно ещё не загружено."""
+        if self._value is MISSING:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        return self._value
+
+    def set(self, value: V, version: int | None = None) -> None:
+        """Сохранить значение (если не было инвалидации после version)."""
+        if version is not None and version != self.version:
+            return
+        self._value = value
+
+    def invalidate(self) -> None:
+        """Сбросить значение."""
+        self.version += 1
+        self._value = MISSING
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики попаданий/промахов."""
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,60 @@
+"""
+Классификация ошибок доставки и учёт недоступных чатов.
+"""
+
+import logging
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import Message
+
+from db_handler import PostgresHandler
+from db_handler.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def undeliverable_reason(error: Exception) -> str | None:
+    """
+    Причина, по которой в чат не доставляются сообщения, или None,
+    если ошибка временная и отправку можно повторить.
+    """
+    if isinstance(error, TelegramForbiddenError):
+        return User.DELIVERY_BLOCKED
+    if isinstance(error, TelegramBadRequest) and "chat not found" in error.message:
+        return User.DELIVERY_CHAT_NOT_FOUND
+    return None
+
+
+def log_delivery_error(chat_id: int, error: Exception) -> None:
+    """Залогировать ошибку доставки с учётом её причины."""
+    reason = undeliverable_reason(error)
+    if reason == User.DELIVERY_BLOCKED:
+        logger.warning(f"Пользователь {chat_id} заблокировал бота")
+    elif reason == User.DELIVERY_CHAT_NOT_FOUND:
+        logger.warning(f"Чат {chat_id} не найден")
+    else:
+        logger.exception(f"Ошибка отправки сообщения в чат {chat_id}: {error}")
+
+
+async def send_message_safe(
+    bot: Bot, db: PostgresHandler, chat_id: int, text: str, **kwargs: Any
+) -> Message | None:
+    """
+    Отправить сообщение, не пробрасывая ошибку доставки.
+
+    Если чат недоступен (бот заблокирован, чат не найден), пользователь
+    отмечается в users.delivery_status и исключается из следующих рассылок.
+
+    Returns:
+        Отправленное сообщение или None
+    """
+    try:
+        return await bot.send_message(chat_id, text, **kwargs)
+    except Exception as e:
+        log_delivery_error(chat_id, e)
+        reason = undeliverable_reason(e)
+        if reason is not None:
+            await db.set_delivery_statuses({chat_id: reason})
+        return None
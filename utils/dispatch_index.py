@@ -0,0 +1,134 @@
+"""
+Индекс хендлеров по точному значению text / callback_data.
+"""
+
+import logging
+from collections.abc import Hashable
+from typing import Any
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.types import TelegramObject
+
+from filters.exact import DataEquals, FieldEquals, TextEquals
+
+logger = logging.getLogger(__name__)
+
+# Фильтр, по значению которого индексируются хендлеры событий
+INDEXED_FILTERS: dict[str, type[FieldEquals]] = {
+    "message": TextEquals,
+    "callback_query": DataEquals,
+}
+
+_NOT_INDEXED = object()
+
+
+def _exact_value(handler: HandlerObject, filter_type: type[FieldEquals]) -> Any:
+    """
+    Значение фильтра filter_type (TextEquals / DataEquals) или _NOT_INDEXED.
+
+    Фильтры хендлера объединяются через И, поэтому хендлер с таким
+    фильтром может сработать только на событие с этим значением поля.
+    """
+    for filter_ in handler.filters or ():
+        if isinstance(filter_.callback, filter_type) and isinstance(
+            filter_.callback.value, Hashable
+        ):
+            return filter_.callback.value
+
+    return _NOT_INDEXED
+
+
+class DispatchIndex:
+    """
+    Замена TelegramEventObserver.trigger с поиском хендлеров по словарю.
+
+    Для события проверяются только хендлеры, у которых есть фильтр
+    TextEquals / DataEquals со значением поля события, и хендлеры без
+    такого фильтра (F.text == ..., regexp, Command, только состояние
+    и т.п.) — в порядке регистрации, как в обычном trigger. Остальные
+    фильтры найденных хендлеров проверяются как обычно.
+
+    Совпадение с обычным trigger проверяется тестом
+    tests/test_dispatch_index.py на всех роутерах бота.
+
+    Индекс перестраивается, если у observer изменилось число хендлеров.
+    """
+
+    def __init__(
+        self, observer: TelegramEventObserver, filter_type: type[FieldEquals]
+    ) -> None:
+        self.observer = observer
+        self.filter_type = filter_type
+        self._size = -1
+        self._by_value: dict[Any, list[HandlerObject]] = {}
+        self._fallback: list[HandlerObject] = []
+
+    @property
+    def indexed(self) -> int:
+        """Сколько хендлеров попало в индекс."""
+        return len(self.observer.handlers) - len(self._fallback)
+
+    def build(self) -> None:
+        handlers = [
+            (handler, _exact_value(handler, self.filter_type))
+            for handler in self.observer.handlers
+        ]
+        values = {value for _, value in handlers if value is not _NOT_INDEXED}
+
+        self._fallback = [h for h, value in handlers if value is _NOT_INDEXED]
+        self._by_value = {
+            key: [h for h, value in handlers if value is _NOT_INDEXED or value == key]
+            for key in values
+        }
+        self._size = len(self.observer.handlers)
+
+    def candidates(self, event: TelegramObject) -> list[HandlerObject]:
+        """Хендлеры, которые могут сработать на событие."""
+        if len(self.observer.handlers) != self._size:
+            self.build()
+
+        value = getattr(event, self.filter_type.field, None)
+        if not isinstance(value, Hashable):
+            return self._fallback
+        return self._by_value.get(value, self._fallback)
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        """То же, что TelegramEventObserver.trigger, но по candidates()."""
+        for handler in self.candidates(event):
+            kwargs["handler"] = handler
+            result, data = await handler.check(event, **kwargs)
+            if result:
+                kwargs.update(data)
+                try:
+                    wrapped_inner = self.observer.outer_middleware.wrap_middlewares(
+                        self.observer._resolve_middlewares(),
+                        handler.call,
+                    )
+                    return await wrapped_inner(event, kwargs)
+                except SkipHandler:
+                    continue
+
+        return UNHANDLED
+
+
+def install_dispatch_index(router: Router) -> None:
+    """
+    Включить индекс для router и всех вложенных роутеров.
+
+    Вызывается после include_routers.
+    """
+    total = indexed = 0
+    for current in router.chain_tail:
+        for event_type, filter_type in INDEXED_FILTERS.items():
+            observer = current.observers[event_type]
+            index = DispatchIndex(observer, filter_type)
+            index.build()
+            observer.trigger = index.trigger  # type: ignore[method-assign]
+
+            total += len(observer.handlers)
+            indexed += index.indexed
+
+    logger.info(f"Индекс хендлеров: {indexed} из {total} по точному значению")
@@ -0,0 +1,49 @@
+"""
+Изоляция апдейтов одного пользователя при конкурентной обработке.
+"""
+
+import asyncio
+from collections.abc import AsyncGenerator, Hashable
+from contextlib import asynccontextmanager
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+
+class UserEventIsolation(BaseEventIsolation):
+    """
+    Последовательная обработка апдейтов с одним ключом FSM.
+
+    FSMContextMiddleware берёт блокировку по ключу хранилища
+    (пользователь в чате) до чтения состояния и держит её до конца
+    обработки, поэтому шаги FSM-сценариев одного пользователя не гонятся,
+    а апдейты разных пользователей обрабатываются параллельно.
+    asyncio.Lock пропускает ожидающих в порядке очереди, так что апдейты
+    пользователя обрабатываются в порядке поступления.
+
+    В отличие от SimpleEventIsolation блокировка удаляется, когда у ключа
+    не остаётся ожидающих апдейтов, и словарь не растёт бесконечно.
+    """
+
+    def __init__(self) -> None:
+        # ключ → (блокировка, число апдейтов, которые её держат или ждут)
+        self._locks: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        lock, waiters = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[key] = (lock, waiters + 1)
+
+        try:
+            async with lock:
+                yield
+        finally:
+            _, waiters = self._locks.get(key, (lock, 1))
+            if waiters <= 1:
+                self._locks.pop(key, None)
+            else:
+                self._locks[key] = (lock, waiters - 1)
+
+    async def close(self) -> None:
+        self._locks.clear()
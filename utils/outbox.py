@@ -0,0 +1,180 @@
+"""
+Очередь отправки сообщений другим пользователям.
+
+Хендлер ставит сообщение в очередь и сразу отвечает своему пользователю,
+а сообщение доставляют фоновые воркеры — в порядке приоритета.
+"""
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from aiogram.methods import SendMessage
+
+from db_handler import PostgresHandler
+from db_handler.session import get_request_scope
+from utils.delivery import log_delivery_error, undeliverable_reason
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты: меньше — раньше
+PRIORITY_HIGH = 0  # Сообщения, меняющие меню или ожидающие действия пользователя
+PRIORITY_NORMAL = 1  # Уведомления
+
+WORKERS = 4
+STOP_TIMEOUT = 10.0  # секунд на отправку оставшихся сообщений при остановке
+
+
+@dataclass(order=True)
+class OutboxItem:
+    """Сообщение в очереди."""
+
+    priority: int
+    seq: int
+    method: SendMessage = field(compare=False)
+    record_id: int | None = field(default=None, compare=False)  # ID в outbox_messages
+
+
+class Outbox:
+    """
+    Очередь исходящих сообщений с пулом воркеров.
+
+    - сообщения отправляются в порядке приоритета, при равном — по очереди;
+    - лимиты и повторы при TelegramRetryAfter обеспечивает
+      RequestLimiterMiddleware сессии бота (отправка сообщения после
+      сетевой ошибки не повторяется, чтобы не продублировать его);
+    - если чат недоступен, пользователь отмечается в users.delivery_status;
+    - сообщение, поставленное в апдейте, отправляется только после commit
+      его unit of work: при откате апдейта оно отбрасывается;
+    - с persist=True сообщения хранятся в outbox_messages до доставки
+      (запись добавляется в транзакции апдейта) и после перезапуска бота
+      отправляются снова.
+
+    Использование в хендлере:
+
+        async def handler(callback: CallbackQuery, outbox: Outbox):
+            await outbox.send(user_id, "Текст", reply_markup=keyboard)
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        db: PostgresHandler,
+        workers: int = WORKERS,
+        persist: bool = False,
+    ) -> None:
+        self.bot = bot
+        self.db = db
+        self.workers = workers
+        self.persist = persist
+
+        self._queue: asyncio.PriorityQueue[OutboxItem] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._tasks: list[asyncio.Task] = []
+
+        self.sent = 0
+        self.failed = 0
+
+    async def send(
+        self,
+        chat_id: int,
+        text: str,
+        priority: int = PRIORITY_NORMAL,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Поставить сообщение в очередь (параметры как у bot.send_message).
+
+        Внутри апдейта сообщение попадает в очередь после commit его
+        unit of work, вне апдейта — сразу.
+        """
+        method = SendMessage(chat_id=chat_id, text=text, **kwargs)
+        record_id = None
+        if self.persist:
+            record_id = await self.db.outbox.add(
+                chat_id, method.model_dump_json(exclude_defaults=True), priority
+            )
+        item = OutboxItem(priority, 0, method, record_id=record_id)
+
+        scope = get_request_scope()
+        if scope is None:
+            self._put(item)
+        else:
+            scope.after_commit(lambda: self._put(item))
+
+    async def start(self) -> None:
+        """Запустить воркеры (и вернуть в очередь сохранённые сообщения)."""
+        if self.persist:
+            for record in await self.db.outbox.get_all():
+                method = SendMessage.model_validate_json(record.payload)
+                self._put(OutboxItem(record.priority, 0, method, record_id=record.id))
+            if self._queue.qsize():
+                logger.info(f"Восстановлено сообщений в очереди: {self._queue.qsize()}")
+
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self, timeout: float = STOP_TIMEOUT) -> None:
+        """Дождаться отправки очереди (не дольше timeout) и остановить воркеры."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Не отправлено сообщений из очереди: {self._queue.qsize()}"
+            )
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict[str, int]:
+        """Статистика очереди."""
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+        }
+
+    def _put(self, item: OutboxItem) -> None:
+        item.seq = next(self._seq)
+        self._queue.put_nowait(item)
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._deliver(item)
+            except Exception as e:
+                logger.exception(f"Ошибка обработки сообщения из очереди: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, item: OutboxItem) -> None:
+        try:
+            await self.bot(item.method)
+        except Exception as e:
+            await self._fail(item, e)
+            return
+
+        self.sent += 1
+        await self._forget(item)
+
+    async def _fail(self, item: OutboxItem, error: Exception) -> None:
+        """Отбросить сообщение, которое не удалось доставить."""
+        self.failed += 1
+        chat_id = item.method.chat_id
+        log_delivery_error(chat_id, error)
+
+        reason = undeliverable_reason(error)
+        if reason is not None:
+            await self.db.set_delivery_statuses({chat_id: reason})
+        await self._forget(item)
+
+    async def _forget(self, item: OutboxItem) -> None:
+        if item.record_id is not None:
+            await self.db.outbox.delete(item.record_id)